@@ -0,0 +1,185 @@
+"""Benchmark fixtures.
+
+Each benchmark records query count and timing,
+result is compared with `baseline.json`:
+
+- query count change always fail.
+- timing regression fail when `--perf-compare` is set.
+
+Use `--perf-save` to update baseline.
+
+Fixture and options use `perf` prefix, so they not conflict with pytest-benchmark plugin.
+"""
+
+import datetime
+import json
+import os
+import statistics
+import timeit
+import typing
+
+import django.db as djdb
+import pytest
+from django.utils import timezone
+
+from tests import models
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+_RESULTS: typing.Dict[str, dict] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('perf')
+    group.addoption(
+        '--perf-save',
+        action='store_true',
+        help='Save result as baseline.',
+    )
+    group.addoption(
+        '--perf-compare',
+        action='store_true',
+        help='Fail when time is slower than baseline.',
+    )
+    group.addoption(
+        '--perf-tolerance',
+        type=float,
+        default=0.5,
+        help='Allowed time increase ratio when compare. Defaults to 0.5.',
+    )
+    group.addoption(
+        '--perf-rounds',
+        type=int,
+        default=5,
+        help='Timing round count. Defaults to 5.',
+    )
+
+
+def _load_baseline() -> typing.Dict[str, dict]:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class Benchmark:
+    """Benchmark runner for one test.  """
+
+    def __init__(self, name: str, config):
+        self.name = name
+        self.rounds: int = config.getoption('--perf-rounds')
+        self.compare: bool = config.getoption('--perf-compare')
+        self.tolerance: float = config.getoption('--perf-tolerance')
+        self.save: bool = config.getoption('--perf-save')
+
+    def __call__(self, fn: typing.Callable, *args, **kwargs):
+        """Run benchmark for function.
+
+        Returns:
+            Return value of first call.
+        """
+
+        queries = []
+
+        def _count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with djdb.connection.execute_wrapper(_count):
+            ret = fn(*args, **kwargs)
+
+        timer = timeit.Timer(lambda: fn(*args, **kwargs))
+        number, _ = timer.autorange()
+        times = [i / number for i in timer.repeat(self.rounds, number)]
+        result = {
+            'queries': len(queries),
+            'min': min(times),
+            'mean': statistics.mean(times),
+        }
+        _RESULTS[self.name] = result
+        if not self.save:
+            self._check(result)
+        return ret
+
+    def _check(self, result: dict):
+        baseline = _load_baseline().get(self.name)
+        if baseline is None:
+            return
+        assert result['queries'] == baseline['queries'], (
+            f'Query count changed: {baseline["queries"]} -> {result["queries"]}, '
+            'use --perf-save to update baseline if expected.')
+        if self.compare:
+            limit = baseline['min'] * (1 + self.tolerance)
+            assert result['min'] <= limit, (
+                f'Slower than baseline: {baseline["min"] * 1e3:.3f}ms -> '
+                f'{result["min"] * 1e3:.3f}ms')
+
+
+@pytest.fixture(name='perf')
+def _perf(request):
+    return Benchmark(request.node.nodeid, request.config)
+
+
+def pytest_sessionfinish(session):
+    if not (_RESULTS and session.config.getoption('--perf-save')):
+        return
+    baseline = _load_baseline()
+    baseline.update(_RESULTS)
+    with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _RESULTS:
+        return
+    baseline = _load_baseline()
+    terminalreporter.section('benchmark')
+    for name, result in sorted(_RESULTS.items()):
+        line = (f'{name:80} {result["queries"]:4} queries '
+                f'{result["min"] * 1e3:10.3f}ms')
+        if name in baseline:
+            line += f' {result["min"] / baseline[name]["min"]:6.2f}x'
+        terminalreporter.write_line(line)
+
+
+REPORTER_COUNT = 100
+ARTICLE_PER_REPORTER = 3
+FRIEND_PER_REPORTER = 2
+
+
+@pytest.fixture(name='dataset')
+def _dataset(db):  # pylint:disable=unused-argument
+    reporters = models.Reporter.objects.bulk_create(
+        models.Reporter(
+            first_name=f'first{i}',
+            last_name=f'last{i}',
+            email=f'reporter{i}@example.com',
+            reporter_type=1,
+        )
+        for i in range(REPORTER_COUNT)
+    )
+    if not all(i.pk for i in reporters):
+        reporters = list(models.Reporter.objects.order_by('pk'))
+    now = timezone.now()
+    models.Article.objects.bulk_create(
+        models.Article(
+            headline=f'article{j} of reporter{i}',
+            pub_date=now.date() - datetime.timedelta(days=j),
+            pub_date_time=now - datetime.timedelta(days=j),
+            reporter=reporter,
+            editor=reporters[(i + 1) % len(reporters)],
+        )
+        for i, reporter in enumerate(reporters)
+        for j in range(ARTICLE_PER_REPORTER)
+    )
+    Friend = models.Reporter.friends.through
+    Friend.objects.bulk_create(
+        Friend(
+            from_reporter_id=reporter.pk,
+            to_reporter_id=reporters[(i + j + 1) % len(reporters)].pk,
+        )
+        for i, reporter in enumerate(reporters)
+        for j in range(FRIEND_PER_REPORTER)
+    )
+    return reporters
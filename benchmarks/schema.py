@@ -0,0 +1,110 @@
+"""Schema used by benchmarks.  """
+
+import graphene
+
+import graphene_django_tools as gdtools
+from tests import models
+
+
+class ReporterFriends(gdtools.Resolver):
+    schema = ['Reporter!']
+
+    def resolve(self, **kwargs):
+        return self.parent.friends.all()
+
+
+class ReporterArticles(gdtools.Resolver):
+    schema = ['Article!']
+
+    def resolve(self, **kwargs):
+        return self.parent.articles.all()
+
+
+class Reporter(gdtools.Resolver):
+    schema = {
+        'type': {
+            'first_name': 'String!',
+            'last_name': 'String!',
+            'email': 'String!',
+            'friends': ReporterFriends,
+            'articles': ReporterArticles,
+        },
+    }
+    model = models.Reporter
+
+
+class Article(gdtools.Resolver):
+    schema = {
+        'type': {
+            'headline': 'String!',
+            'pub_date': 'Date!',
+            'reporter': 'Reporter!',
+            'editor': 'Reporter!',
+        },
+    }
+    model = models.Article
+
+
+class Articles(gdtools.Resolver):
+    schema = gdtools.connection.get_type(Article)
+
+    def resolve(self, **kwargs):
+        qs = models.Article.objects.order_by('pk')
+        return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+
+class Nodes(gdtools.Resolver):
+    schema = {
+        'args': {
+            'ids': ['ID!'],
+        },
+        'type': ['Reporter!'],
+    }
+
+    def resolve(self, **kwargs):
+        return self.resolve_gids(kwargs['ids'])
+
+
+class Info(gdtools.Resolver):
+    """Capture resolve info for optimization benchmark.  """
+
+    schema = ['Article!']
+    captured = []
+
+    def resolve(self, **kwargs):
+        self.captured.append(self.info)
+        return []
+
+
+class Query(graphene.ObjectType):
+    articles = Articles.as_field()
+    nodes = Nodes.as_field()
+    info = Info.as_field()
+
+
+SCHEMA = graphene.Schema(query=Query)
+
+
+def set_optimization_options():
+    """Configure optimization options for benchmark schema.  """
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS.update({
+        'Article': {
+            'select': {'reporter': ['reporter'], 'editor': ['editor']},
+            'related': {'reporter': 'reporter', 'editor': 'editor'},
+        },
+        'Reporter': {
+            'only': {None: ['reporter_type']},
+            'prefetch': {'friends': ['friends'], 'articles': ['articles']},
+            'related': {'friends': 'friends', 'articles': 'articles'},
+        },
+    })
+
+
+def get_info(query: str, **kwargs):
+    """Get resolve info of `info` field in query.  """
+
+    Info.captured.clear()
+    result = SCHEMA.execute(query, **kwargs)
+    assert not result.errors, result.errors
+    return Info.captured[0]
@@ -0,0 +1,41 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import pytest
+
+from . import schema
+
+pytestmark = [pytest.mark.django_db]
+
+NODE_SELECTIONS = {
+    1: 'headline',
+    2: 'headline reporter { firstName }',
+    3: 'headline reporter { firstName friends { firstName } }',
+    4: 'headline reporter { firstName friends { firstName articles { headline } } }',
+}
+
+
+@pytest.mark.parametrize('depth', sorted(NODE_SELECTIONS))
+@pytest.mark.parametrize('first', [10, 50, 200])
+def test_optimized_resolve(perf, dataset, first, depth):
+    schema.set_optimization_options()
+    query = f'''\
+query articles($first: Int) {{
+    articles(first: $first) {{
+        nodes {{ {NODE_SELECTIONS[depth]} }}
+        pageInfo {{ hasNextPage endCursor }}
+    }}
+}}
+'''
+
+    def _execute():
+        result = schema.SCHEMA.execute(
+            query,
+            context_value=http.HttpRequest(),
+            variable_values={'first': first},
+        )
+        assert not result.errors, result.errors
+        return result
+
+    result = perf(_execute)
+    assert len(result.data['articles']['nodes']) == first
@@ -0,0 +1,26 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+from graphene_django_tools import global_id
+
+ITEMS = [('Article', str(i)) for i in range(1000)]
+ENCODED = global_id.encode_many(ITEMS)
+
+
+def test_encode(perf):
+    perf(lambda: [global_id.encode(*i) for i in ITEMS])
+
+
+def test_encode_many(perf):
+    perf(global_id.encode_many, ITEMS)
+
+
+def test_decode(perf):
+    perf(lambda: [global_id.decode(i) for i in ENCODED])
+
+
+def test_decode_many(perf):
+    perf(global_id.decode_many, ENCODED)
+
+
+def test_parse(perf):
+    perf(lambda: [global_id.GlobalID.parse(i) for i in ENCODED])
@@ -0,0 +1,99 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import pytest
+
+import graphene_django_tools as gdtools
+from tests import models
+
+from . import schema
+
+pytestmark = [pytest.mark.django_db]
+
+DEEP_QUERY = '''\
+{
+    info {
+        headline
+        pubDate
+        reporter {
+            firstName
+            friends {
+                firstName
+                articles {
+                    headline
+                    editor {
+                        firstName
+                        lastName
+                        friends {
+                            email
+                        }
+                    }
+                }
+            }
+        }
+        editor {
+            firstName
+            articles {
+                headline
+            }
+        }
+    }
+}
+'''
+
+FRAGMENT_QUERY = '''\
+fragment ReporterName on Reporter {
+    firstName
+    lastName
+}
+
+fragment ReporterDetail on Reporter {
+    ...ReporterName
+    email
+    friends {
+        ...ReporterName
+    }
+}
+
+fragment ArticleDetail on Article {
+    headline
+    pubDate
+    reporter {
+        ...ReporterDetail
+        articles {
+            headline
+            editor {
+                ...ReporterDetail
+            }
+        }
+    }
+    editor {
+        ...ReporterDetail
+    }
+}
+
+{
+    info {
+        ...ArticleDetail
+        ... on Article {
+            reporter {
+                ...ReporterName
+            }
+        }
+    }
+}
+'''
+
+
+@pytest.mark.parametrize('query', [DEEP_QUERY, FRAGMENT_QUERY], ids=['deep', 'fragment'])
+@pytest.mark.parametrize('cached', [False, True], ids=['cold', 'cached'])
+def test_optimize(perf, query, cached):
+    schema.set_optimization_options()
+    info = schema.get_info(query)
+    qs = models.Article.objects.all()
+
+    def _optimize():
+        if not cached:
+            gdtools.queryset.clear_plan_cache()
+        return gdtools.queryset.optimize(qs, info)
+
+    perf(_optimize)
@@ -0,0 +1,35 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import pytest
+
+import graphene_django_tools as gdtools
+
+from . import schema
+
+pytestmark = [pytest.mark.django_db]
+
+QUERY = '''\
+query nodes($ids: [ID!]!) {
+    nodes(ids: $ids) {
+        firstName
+    }
+}
+'''
+
+
+@pytest.mark.parametrize('count', [10, 100])
+def test_resolve_gids(perf, dataset, count):
+    ids = [str(gdtools.GlobalID.from_object(i)) for i in dataset[:count]]
+
+    def _execute():
+        result = schema.SCHEMA.execute(
+            QUERY,
+            context_value=http.HttpRequest(),
+            variable_values={'ids': ids},
+        )
+        assert not result.errors, result.errors
+        return result
+
+    result = perf(_execute)
+    assert len(result.data['nodes']) == count
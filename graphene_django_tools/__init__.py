@@ -1,5 +1,5 @@
 """https://github.com/NateScarlet/graphene-django-tools  """
 
-from . import connection, model_type, queryset
+from . import connection, instrumentation, model_type, nplusone, queryset
 from .global_id import GlobalID
 from .resolver import Resolver
@@ -0,0 +1,215 @@
+"""Asyncio data loader for django model.
+
+Django ORM is synchronous, batch queries run in a dedicated thread pool,
+so event loop is not blocked.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import typing
+
+from . import dataloader, queryset
+
+if typing.TYPE_CHECKING:
+    from .instrumentation import Instrumentation
+
+EXECUTOR_MAX_WORKERS = 8
+_EXECUTOR: typing.Optional[concurrent.futures.Executor] = None
+
+
+def get_executor() -> concurrent.futures.Executor:
+    """Get executor that runs database queries for async loaders.
+
+    Returns:
+        concurrent.futures.Executor: Thread pool, created on first call.
+    """
+
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is None:
+        _EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+            max_workers=EXECUTOR_MAX_WORKERS,
+            thread_name_prefix='graphene_django_tools',
+        )
+    return _EXECUTOR
+
+
+def set_executor(executor: typing.Optional[concurrent.futures.Executor]) -> None:
+    """Set executor that runs database queries for async loaders.
+
+    Args:
+        executor (typing.Optional[concurrent.futures.Executor]): Executor to use,
+            `None` to create default thread pool on next use.
+    """
+
+    global _EXECUTOR  # pylint: disable=global-statement
+    _EXECUTOR = executor
+
+
+async def run_in_executor(func: typing.Callable, *args):
+    """Run sync function in async loader executor,
+    old database connections of worker thread are closed before and after it.
+
+    Returns:
+        Function return value.
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(dataloader._close_old_connections(func), *args),
+    )
+
+
+class AsyncDataLoader:
+    """Asyncio data loader.
+
+    Keys loaded in same event loop iteration are dispatched as one batch.
+
+    Args:
+        batch_load_fn: Coroutine function that takes key list,
+            returns value list in same order. Exception instance value
+            will be set as exception for that key.
+        get_cache_key (optional): Function to get cache key from key.
+    """
+
+    def __init__(
+            self,
+            batch_load_fn: typing.Callable[[typing.List], typing.Awaitable[typing.List]],
+            *,
+            get_cache_key: typing.Callable[[typing.Any], typing.Hashable] = None,
+    ):
+        self.batch_load_fn = batch_load_fn
+        self.get_cache_key = get_cache_key or (lambda v: v)
+        self._cache: typing.Dict[typing.Hashable, asyncio.Future] = {}
+        self._queue: typing.List[typing.Tuple[typing.Any, asyncio.Future]] = []
+
+    def load(self, key) -> asyncio.Future:
+        """Load value for key.
+
+        Returns:
+            asyncio.Future: Future of loaded value.
+        """
+
+        cache_key = self.get_cache_key(key)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+        loop = asyncio.get_running_loop()
+        ret = loop.create_future()
+        self._cache[cache_key] = ret
+        if not self._queue:
+            loop.call_soon(self._dispatch)
+        self._queue.append((key, ret))
+        return ret
+
+    def load_many(self, keys: typing.Iterable) -> asyncio.Future:
+        """Load values for keys.
+
+        Returns:
+            asyncio.Future: Future of loaded value list in same order.
+        """
+
+        return asyncio.gather(*(self.load(i) for i in keys))
+
+    def prime(self, key, value) -> 'AsyncDataLoader':
+        """Prime cache with value, skipped if key already cached.
+
+        Returns:
+            AsyncDataLoader: self, for function chain.
+        """
+
+        cache_key = self.get_cache_key(key)
+        if cache_key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[cache_key] = future
+        return self
+
+    def clear(self, key) -> 'AsyncDataLoader':
+        """Remove key from cache.
+
+        Returns:
+            AsyncDataLoader: self, for function chain.
+        """
+
+        self._cache.pop(self.get_cache_key(key), None)
+        return self
+
+    def clear_all(self) -> 'AsyncDataLoader':
+        """Remove all keys from cache.
+
+        Returns:
+            AsyncDataLoader: self, for function chain.
+        """
+
+        self._cache.clear()
+        return self
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, []
+        asyncio.ensure_future(self._dispatch_queue(queue))
+
+    async def _dispatch_queue(self, queue):
+        keys = [key for key, _ in queue]
+        try:
+            values = await self.batch_load_fn(keys)
+            if len(values) != len(keys):
+                raise TypeError(
+                    'Batch load function should return same length list as keys: '
+                    f'keys={keys}, values={values}')
+        except Exception as ex:  # pylint: disable=broad-except
+            for key, future in queue:
+                self.clear(key)
+                if not future.done():
+                    future.set_exception(ex)
+            return
+        for (key, future), value in zip(queue, values):
+            if future.done():
+                continue
+            if isinstance(value, Exception):
+                self.clear(key)
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+
+def get_for_model(
+        model,
+        *,
+        optimization: 'queryset.Optimization' = None,
+        max_batch_size: typing.Optional[int] = None,
+        instrumentation: typing.Optional['Instrumentation'] = None,
+) -> AsyncDataLoader:
+    """Create asyncio dataloader for model.
+
+    Args:
+        model: Django model.
+        optimization (queryset.Optimization, optional): Optimization result
+            that apply to loader queryset.
+            Defaults to None.
+        max_batch_size (int, optional): Max key count in one query,
+            larger batch is split to chunks that run concurrently.
+            Defaults to `dataloader.MAX_BATCH_SIZE`.
+        instrumentation (Instrumentation, optional): Record batches to it,
+            queries run in executor thread are not captured by it.
+            Defaults to None.
+
+    Returns:
+        AsyncDataLoader: Loader that load primary key to model object.
+    """
+
+    if max_batch_size is None:
+        max_batch_size = dataloader.MAX_BATCH_SIZE
+
+    async def batch_load_fn(keys):
+        results = await asyncio.gather(*(
+            run_in_executor(dataloader._load_models, model, i,
+                            optimization, instrumentation)
+            for i in dataloader._iter_chunks(keys, max_batch_size)
+        ))
+        return [j for i in results for j in i]
+
+    return AsyncDataLoader(
+        batch_load_fn,
+        get_cache_key=dataloader._get_model_cache_key_fn(model),
+    )
@@ -0,0 +1,56 @@
+"""Asyncio methods for enhanced resolver.  """
+
+import typing
+
+from . import async_dataloader, model_type
+from .global_id import GlobalID
+
+if typing.TYPE_CHECKING:
+    from .async_dataloader import AsyncDataLoader
+
+
+class AsyncResolverMixin:
+    """Resolver methods that use asyncio dataloader,
+    mixed into `Resolver`.
+    """
+
+    _async_loader_cache_attname = '_django_model_async_loader_cache'
+
+    def get_async_loader(self, model) -> 'AsyncDataLoader':
+        """Get asyncio dataloader for model.
+        for same request, will always returns same dataloader object.
+
+        Returns:
+            AsyncDataLoader: Dataloader for given model
+        """
+
+        cache = self.get_context_cache(self._async_loader_cache_attname)
+        if model not in cache:
+            cache[model] = async_dataloader.get_for_model(
+                model, instrumentation=self.get_instrumentation())
+        return cache[model]
+
+    async def aresolve_gid(self, v):
+        """Async version of `resolve_gid`, using asyncio dataloader.
+
+        Returns:
+            Model object.
+        """
+
+        gid = GlobalID.cast(v)
+        model = model_type.get_model(gid.type)
+        loader = self.get_async_loader(model)
+        if isinstance(v, model):
+            loader.prime(gid.value, v)
+        return await loader.load(gid.value)
+
+    async def aget_node(self, id_):
+        """Async version of `get_node`, using asyncio dataloader.
+
+        Returns:
+            Node value.
+        """
+
+        if not self.model:
+            return self.get_node(id_)
+        return await self.get_async_loader(self.model).load(id_)
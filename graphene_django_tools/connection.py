@@ -13,9 +13,19 @@ from graphene_resolver.connection import build_schema as _build_schema
 from graphene_resolver.connection import get_type as _get_type
 from graphene_resolver.connection import resolve as _resolve
 from graphene_resolver.connection import resolver
+from graphql_relay.connection import arrayconnection
+from promise import Promise
 
 from . import queryset as qs_
+from .connection_batched import _get_batch_loader
+from .connection_count import COUNT_OPTIONS, get_count
+from .connection_keyset import _load_keyset_fields, resolve_keyset
+from .model_field import _get_model_field
 from .resolver import Resolver
+from .selection_optimization import _get_inner_type
+
+if typing.TYPE_CHECKING:
+    from .connection_count import CountOption
 
 build_schema = _build_schema
 REGISTRY = _REGISTRY
@@ -36,11 +46,14 @@ def set_optimization_default(
     name = _get_node_name(node)
     edge_name = edge_name or f"{re.sub('Connection$', '', name)}Edge"
 
-    opt = qs_.OPTIMIZATION_OPTIONS.setdefault(name, {})
-    opt.setdefault('related', {'nodes': 'self', 'edges': 'self', })
+    # Replace whole item, so optimization plan cache will be invalidated.
+    opt = dict(qs_.OPTIMIZATION_OPTIONS.get(name, {}))
+    opt['related'] = {'nodes': 'self', 'edges': 'self', **opt.get('related', {})}
+    qs_.OPTIMIZATION_OPTIONS[name] = opt
 
-    opt = qs_.OPTIMIZATION_OPTIONS.setdefault(edge_name, {})
-    opt.setdefault('related', {'node': 'self'})
+    opt = dict(qs_.OPTIMIZATION_OPTIONS.get(edge_name, {}))
+    opt['related'] = {'node': 'self', **opt.get('related', {})}
+    qs_.OPTIMIZATION_OPTIONS[edge_name] = opt
 
 
 def get_type(
@@ -65,14 +78,61 @@ def get_type(
     return ret
 
 
+def _resolve_queryset(
+        queryset: djm.QuerySet,
+        *,
+        first: int = None,
+        last: int = None,
+        after: str = None,
+        before: str = None,
+        **_,
+) -> dict:
+    ret = _resolve(queryset, lazy.Proxy(queryset.count),
+                   first=first, last=last, after=after, before=before)
+    if not isinstance(first, int) or isinstance(last, int) or before:
+        return ret
+
+    # Fetch one more row to get `hasNextPage`, instead of count.
+    start_index = arrayconnection.get_offset_with_default(after, -1) + 1
+    end_index = start_index + first
+
+    def _get_page():
+        rows = list(queryset[start_index:end_index + 1])
+        return {'nodes': rows[:first], 'has_next_page': len(rows) > first}
+
+    page = lazy.Proxy(_get_page)
+    nodes = lazy.Proxy(lambda: page['nodes'])
+    edges = lazy.Proxy(lambda: [
+        {
+            'node': node,
+            'cursor': arrayconnection.offset_to_cursor(start_index + i),
+        }
+        for i, node in enumerate(nodes)
+    ])
+    ret['nodes'] = nodes
+    ret['edges'] = edges
+    ret['pageInfo']['end_cursor'] = lazy.Proxy(
+        lambda: edges[-1]['cursor'] if edges else None)
+    ret['pageInfo']['has_next_page'] = lazy.Proxy(
+        lambda: page['has_next_page'])
+    return ret
+
+
 def resolve(
         iterable,
+        *,
+        keyset: bool = False,
+        count_option: typing.Optional['CountOption'] = None,
         **kwargs,
 ) -> dict:
     """Resolve iterable to connection
 
     Args:
         iterable (typign.Iterable): value
+        keyset (bool, optional): Use keyset pagination, iterable should be a queryset.
+            Defaults to False.
+        count_option (typing.Optional[CountOption], optional): Option for `totalCount`.
+            Defaults to None, means exact count.
 
     Returns:
         dict: Connection data.
@@ -81,12 +141,17 @@ def resolve(
     if isinstance(iterable, djm.Manager):
         iterable = iterable.all()
 
-    if isinstance(iterable, djm.QuerySet):
-        _len = lazy.Proxy(iterable.count)
-    else:
-        _len = len(iterable)
+    if not isinstance(iterable, djm.QuerySet):
+        return _resolve(iterable, len(iterable), **kwargs)
 
-    return _resolve(iterable, _len, **kwargs)
+    if keyset:
+        ret = resolve_keyset(iterable, **kwargs)
+    else:
+        ret = _resolve_queryset(iterable, **kwargs)
+    if count_option:
+        ret['totalCount'] = lazy.Proxy(
+            lambda: get_count(iterable, count_option))
+    return ret
 
 
 def optimized_resolve(
@@ -106,6 +171,12 @@ def optimized_resolve(
     """
 
     qs = qs_.optimize(queryset.all(), info)
+    if kwargs.get('keyset'):
+        qs = _load_keyset_fields(qs)
+    kwargs.setdefault(
+        'count_option',
+        COUNT_OPTIONS.get(_get_inner_type(info.return_type).name),
+    )
     ret = resolve(qs, **kwargs)
 
     def _prime_nodes(v):
@@ -116,3 +187,49 @@ def optimized_resolve(
     nodes = ret['nodes']
     ret['nodes'] = lazy.Proxy(lambda: _prime_nodes(nodes))
     return ret
+
+
+def batched_resolve(
+        info: graphql.ResolveInfo,
+        queryset: djm.QuerySet,
+        parent_field: str,
+        parent: typing.Any,
+        **kwargs,
+) -> Promise:
+    """Resolve child connection of parent with a dataloader,
+    so child connection of all parents is resolved with one query.
+
+    Rows of each parent are paginated with `ROW_NUMBER()` window function,
+    `totalCount` is counted for all parents with one grouped query when selected.
+    Only `first` and `after` are batched, other arguments fallback to `optimized_resolve`.
+
+    Args:
+        info (graphql.ResolveInfo): Resolve info.
+        queryset (djm.QuerySet): Queryset of children for all parents,
+            parents that use different queryset are loaded in separate batches.
+        parent_field (str): Foreign key field of children that refer to parent.
+        parent (typing.Any): Parent model object or referred value.
+
+    Raises:
+        ValueError: `parent_field` is not a foreign key, or ordering not supported.
+
+    Returns:
+        Promise: Resolve to connection data.
+    """
+
+    field = _get_model_field(queryset.model, parent_field)
+    if field is None or not field.concrete or not (field.many_to_one or field.one_to_one):
+        raise ValueError(
+            f'Batched connection requires foreign key field: {parent_field}')
+    if isinstance(parent, djm.Model):
+        parent = getattr(parent, field.target_field.attname)
+    else:
+        parent = field.target_field.to_python(parent)
+    if any(kwargs.get(i) is not None for i in ('last', 'before')) or kwargs.get('keyset'):
+        return Promise.resolve(optimized_resolve(
+            info, queryset.filter(**{parent_field: parent}), **kwargs))
+
+    return _get_batch_loader(
+        info, queryset, parent_field,
+        first=kwargs.get('first'), after=kwargs.get('after'),
+    ).load(parent)
@@ -0,0 +1,179 @@
+"""Batched child connection loading.  """
+# pylint: disable=invalid-name
+
+import typing
+
+import django.core.exceptions as djce
+import django.db as djdb
+import django.db.models as djm
+import graphql
+import lazy_object_proxy as lazy
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import RowNumber
+from graphql_relay.connection import arrayconnection
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from . import instrumentation as instrumentation_
+from . import queryset as qs_
+from .connection_keyset import _get_queryset_ordering
+from .resolver import Resolver
+
+
+def _get_window_ordering(queryset: djm.QuerySet) -> typing.List[djm.expressions.OrderBy]:
+    ret = []
+    for i in _get_queryset_ordering(queryset):
+        if isinstance(i, str) and i != '?':
+            i = djm.F(i[1:]).desc() if i.startswith('-') else djm.F(i).asc()
+        elif hasattr(i, 'asc') and not isinstance(i, djm.expressions.OrderBy):
+            i = i.asc()
+        if not isinstance(i, djm.expressions.OrderBy):
+            raise ValueError(
+                f'Batched connection not support ordering: {repr(i)}')
+        ret.append(i)
+    # Primary key as tiebreaker, so row number is stable.
+    ret.append(djm.F('pk').asc())
+    return ret
+
+
+def _get_batch_page_queryset(
+        queryset: djm.QuerySet,
+        parent_field: str,
+        keys: typing.List[typing.Any],
+        start_index: int,
+        end_index: typing.Optional[int],
+) -> djm.QuerySet:
+    """Filter queryset to rows in `[start_index, end_index)` of each parent.  """
+
+    qs = queryset.filter(**{f'{parent_field}__in': keys})
+    if not start_index and end_index is None:
+        return qs
+    ordering = _get_window_ordering(queryset)
+    rows = (qs
+            .order_by()
+            .annotate(
+                _batch_pk=djm.F('pk'),
+                _batch_row_number=Window(
+                    RowNumber(),
+                    partition_by=[djm.F(parent_field)],
+                    order_by=ordering,
+                ))
+            .values('_batch_pk', '_batch_row_number'))
+    sql, params = rows.query.sql_with_params()
+    qn = djdb.connections[queryset.db].ops.quote_name
+    # Window function is not allowed in `WHERE`, so filter it in a subquery.
+    where = f'{qn("_batch_row_number")} > %s'
+    params = (*params, start_index)
+    if end_index is not None:
+        where += f' AND {qn("_batch_row_number")} <= %s'
+        params = (*params, end_index)
+    # Order rows same as row number, so page matches cursor.
+    return qs.filter(pk__in=RawSQL(
+        f'SELECT {qn("_batch_pk")} FROM ({sql}) {qn("_batch")} WHERE {where}',
+        params,
+    )).order_by(*ordering)
+
+
+def _get_batch_load_fn(
+        info: graphql.ResolveInfo,
+        queryset: djm.QuerySet,
+        parent_field: str,
+        *,
+        first: int = None,
+        after: str = None,
+):
+    start_index = arrayconnection.get_offset_with_default(after, -1) + 1
+    # Fetch one more row for each parent to get `hasNextPage`.
+    end_index = start_index + first + 1 if isinstance(first, int) else None
+
+    def batch_load_fn(keys):
+        # Prime dataloader cache
+        loader = Resolver(info=info).get_loader(queryset.model)
+        qs = _get_batch_page_queryset(
+            qs_.optimize(queryset.all(), info),
+            parent_field,
+            keys,
+            start_index,
+            end_index,
+        ).annotate(_batch_parent=djm.F(parent_field))
+        groups: typing.Dict[typing.Any, list] = {i: [] for i in keys}
+        for i in qs:
+            loader.prime(i.pk, i)
+            groups[i._batch_parent].append(i)  # pylint: disable=protected-access
+        counts = lazy.Proxy(lambda: dict(
+            queryset
+            .filter(**{f'{parent_field}__in': keys})
+            .order_by()
+            .values_list(parent_field)
+            .annotate(djm.Count('pk'))
+        ))
+
+        def _get_connection(key):
+            rows = groups[key]
+            nodes = rows[:first] if isinstance(first, int) else rows
+            edges = [
+                {
+                    'node': node,
+                    'cursor': arrayconnection.offset_to_cursor(start_index + i),
+                }
+                for i, node in enumerate(nodes)
+            ]
+            return {
+                'nodes': nodes,
+                'edges': edges,
+                'pageInfo': {
+                    'start_cursor': edges[0]['cursor'] if edges else None,
+                    'end_cursor': edges[-1]['cursor'] if edges else None,
+                    'has_previous_page': False,
+                    'has_next_page': len(rows) > len(nodes),
+                },
+                'totalCount': lazy.Proxy(lambda: counts.get(key, 0)),
+            }
+
+        return Promise.resolve([_get_connection(i) for i in keys])
+
+    return batch_load_fn
+
+
+_BATCH_LOADER_CACHE_ATTNAME = '_django_batched_connection_loader_cache'
+
+
+def _get_queryset_key(queryset: djm.QuerySet) -> typing.Hashable:
+    """Identify queryset by its query,
+    so parents that use different queryset not share loader.
+    """
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except djce.EmptyResultSet:
+        # No rows for any parent.
+        return None
+    return queryset.db, sql, repr(params)
+
+
+def _get_batch_loader(
+        info: graphql.ResolveInfo,
+        queryset: djm.QuerySet,
+        parent_field: str,
+        *,
+        first: int = None,
+        after: str = None,
+) -> DataLoader:
+    cache = Resolver(info=info).get_context_cache(_BATCH_LOADER_CACHE_ATTNAME)
+    key = (
+        # Same field under different list items share loader.
+        tuple(i for i in info.path or () if not isinstance(i, int)),
+        queryset.model,
+        _get_queryset_key(queryset),
+        parent_field,
+        first,
+        after,
+    )
+    if key not in cache:
+        loader = DataLoader(_get_batch_load_fn(
+            info, queryset, parent_field, first=first, after=after))
+        instrumentation = instrumentation_.get_for_context(info.context)
+        if instrumentation is not None:
+            instrumentation.track_loader(loader)
+        cache[key] = loader
+    return cache[key]
@@ -0,0 +1,62 @@
+"""Connection `totalCount` options.  """
+
+import json
+import typing
+
+import django.db as djdb
+import django.db.models as djm
+
+if typing.TYPE_CHECKING:
+    class CountOption(typing.TypedDict, total=False):
+        """
+        Connection `totalCount` option dict.
+        See :doc:`/connection` for more information.
+        """
+
+        mode: str
+        cap: int
+
+
+COUNT_OPTIONS: typing.Dict[str, 'CountOption'] = {}
+
+
+def _get_estimated_count(queryset: djm.QuerySet) -> int:
+    conn = djdb.connections[queryset.db]
+    if conn.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.query.sql_with_params()
+    with conn.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def get_count(
+        queryset: djm.QuerySet,
+        option: typing.Optional['CountOption'] = None,
+) -> int:
+    """Count queryset with count option.
+
+    Args:
+        queryset (djm.QuerySet): Queryset to count.
+        option (typing.Optional[CountOption], optional): Count option.
+            Defaults to None, means exact count.
+
+    Raises:
+        ValueError: Unknown count mode.
+
+    Returns:
+        int: Count result.
+    """
+
+    option = option or {}
+    mode = option.get('mode', 'exact')
+    if mode == 'exact':
+        return queryset.count()
+    if mode == 'capped':
+        return queryset[:option['cap']].count()
+    if mode == 'estimated':
+        return _get_estimated_count(queryset)
+    raise ValueError(f'Unknown count mode: {mode}')
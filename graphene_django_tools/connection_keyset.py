@@ -0,0 +1,212 @@
+"""Connection keyset pagination.  """
+# pylint: disable=invalid-name
+
+import binascii
+import json
+import typing
+
+import django.core.exceptions as djce
+import django.db.models as djm
+import graphql_relay.utils
+import lazy_object_proxy as lazy
+
+from .model_field import _get_model_field
+
+KEYSET_CURSOR_PREFIX = 'keyset:'
+
+
+def _get_queryset_ordering(queryset: djm.QuerySet) -> typing.Sequence:
+    """Get ordering that queryset uses, model default ordering included.  """
+
+    query = queryset.query
+    return query.order_by or (
+        query.get_meta().ordering if query.default_ordering else ())
+
+
+def _get_keyset_ordering(queryset: djm.QuerySet) -> typing.List[typing.Tuple[str, bool]]:
+    """Get (lookup, descending) pairs from queryset ordering,
+    primary key is appended as tiebreaker.
+    """
+
+    ret = []
+    for i in _get_queryset_ordering(queryset):
+        if isinstance(i, djm.expressions.OrderBy) and isinstance(i.expression, djm.F):
+            ret.append((i.expression.name, i.descending))
+        elif isinstance(i, djm.F):
+            ret.append((i.name, False))
+        elif isinstance(i, str) and i != '?':
+            ret.append((i.lstrip('-'), i.startswith('-')))
+        else:
+            raise ValueError(
+                f'Keyset pagination not support ordering: {repr(i)}')
+
+    pk = queryset.model._meta.pk
+    ret = [(pk.name if lookup == 'pk' else lookup, desc) for lookup, desc in ret]
+    for lookup, _ in ret:
+        field = _get_model_field(queryset.model, lookup)
+        if field is None or field.is_relation:
+            raise ValueError(
+                f'Keyset pagination only support ordering by non-relation field: {lookup}')
+    if not any(lookup in (pk.name, pk.attname) for lookup, _ in ret):
+        ret.append((pk.name, False))
+    return ret
+
+
+def _load_keyset_fields(queryset: djm.QuerySet) -> djm.QuerySet:
+    """Load ordering fields used by cursor, even not selected by query.  """
+
+    lookups = [lookup for lookup, _ in _get_keyset_ordering(queryset)]
+    relations = [i.rsplit('__', 1)[0] for i in lookups if '__' in i]
+    if relations:
+        queryset = queryset.select_related(*relations)
+    field_names, defer = queryset.query.deferred_loading
+    if defer:
+        return queryset.defer(None).defer(*(set(field_names) - set(lookups)))
+    return queryset.only(*field_names, *relations, *lookups)
+
+
+def _get_keyset_value(obj: djm.Model, lookup: str) -> typing.Optional[str]:
+    *path, name = lookup.split('__')
+    for i in path:
+        obj = getattr(obj, i)
+    field = obj._meta.get_field(name)
+    if field.value_from_object(obj) is None:
+        return None
+    # Keep full precision, unlike json encoder.
+    return field.value_to_string(obj)
+
+
+def _encode_keyset_cursor(obj: djm.Model, ordering: typing.List[typing.Tuple[str, bool]]) -> str:
+    values = [_get_keyset_value(obj, lookup) for lookup, _ in ordering]
+    return graphql_relay.utils.base64(
+        KEYSET_CURSOR_PREFIX + json.dumps(values))
+
+
+def _decode_keyset_cursor(
+        model: typing.Type[djm.Model],
+        cursor: str,
+        ordering: typing.List[typing.Tuple[str, bool]]
+) -> typing.List[typing.Any]:
+    try:
+        data = graphql_relay.utils.unbase64(cursor)
+        if not data.startswith(KEYSET_CURSOR_PREFIX):
+            raise ValueError('Missing keyset cursor prefix')
+        values = json.loads(data[len(KEYSET_CURSOR_PREFIX):])
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError('Keyset cursor not match ordering')
+        return [_get_model_field(model, lookup).to_python(v)
+                for (lookup, _), v in zip(ordering, values)]
+    except (TypeError, ValueError, binascii.Error, djce.ValidationError) as ex:
+        raise ValueError(f'Invalid cursor: {cursor}') from ex
+
+
+def _get_keyset_filter(
+        ordering: typing.List[typing.Tuple[str, bool]],
+        values: typing.List[typing.Any],
+        *,
+        is_after: bool,
+) -> djm.Q:
+    """Expand row value comparison `(a, b) > (x, y)` to
+    `a > x OR (a = x AND b > y)`, so mixed ordering direction is supported.
+    """
+
+    ret = djm.Q()
+    for index, ((lookup, desc), value) in enumerate(zip(ordering, values)):
+        operator = 'gt' if desc != is_after else 'lt'
+        q = djm.Q(**{f'{lookup}__{operator}': value})
+        for _lookup, _value in zip(
+                (i for i, _ in ordering[:index]), values[:index]):
+            q &= djm.Q(**{_lookup: _value})
+        ret |= q
+    return ret
+
+
+def resolve_keyset(
+        queryset: djm.QuerySet,
+        *,
+        first: int = None,
+        last: int = None,
+        after: str = None,
+        before: str = None,
+        **_,
+) -> dict:
+    """Resolve queryset to connection with keyset pagination.
+
+    Cursor encodes values of queryset ordering fields and primary key,
+    so page query use indexed `WHERE` condition instead of `OFFSET`.
+    Ordering fields should be non-null, and not across many valued relation.
+
+    Args:
+        queryset (djm.QuerySet): Queryset to resolve.
+
+    Raises:
+        ValueError: Ordering not supported or cursor is invalid.
+
+    Returns:
+        dict: Connection data.
+    """
+
+    model = queryset.model
+    ordering = _get_keyset_ordering(queryset)
+    total_count = lazy.Proxy(queryset.count)
+
+    qs = queryset
+    if after:
+        qs = qs.filter(_get_keyset_filter(
+            ordering, _decode_keyset_cursor(model, after, ordering), is_after=True))
+    if before:
+        qs = qs.filter(_get_keyset_filter(
+            ordering, _decode_keyset_cursor(model, before, ordering), is_after=False))
+
+    def _get_page():
+        has_previous_page = has_next_page = False
+        if isinstance(last, int) and not isinstance(first, int):
+            nodes = list(qs.order_by(*(
+                lookup if desc else f'-{lookup}'
+                for lookup, desc in ordering
+            ))[:last + 1])
+            has_previous_page = len(nodes) > last
+            nodes = nodes[:last][::-1]
+        else:
+            nodes = qs.order_by(*(
+                f'-{lookup}' if desc else lookup
+                for lookup, desc in ordering
+            ))
+            if isinstance(first, int):
+                nodes = list(nodes[:first + 1])
+                has_next_page = len(nodes) > first
+                nodes = nodes[:first]
+            else:
+                nodes = list(nodes)
+            if isinstance(last, int):
+                has_previous_page = len(nodes) > last
+                nodes = nodes[max(len(nodes) - last, 0):]
+        return {
+            'nodes': nodes,
+            'has_previous_page': has_previous_page,
+            'has_next_page': has_next_page,
+        }
+
+    page = lazy.Proxy(_get_page)
+    edges = lazy.Proxy(lambda: [
+        {
+            'node': i,
+            'cursor': _encode_keyset_cursor(i, ordering),
+        }
+        for i in page['nodes']
+    ])
+
+    return {
+        'nodes': lazy.Proxy(lambda: page['nodes']),
+        'edges': edges,
+        'pageInfo': {
+            'start_cursor': lazy.Proxy(
+                lambda: edges[0]['cursor'] if edges else None),
+            'end_cursor': lazy.Proxy(
+                lambda: edges[-1]['cursor'] if edges else None),
+            'has_previous_page': lazy.Proxy(
+                lambda: page['has_previous_page']),
+            'has_next_page': lazy.Proxy(lambda: page['has_next_page']),
+        },
+        'totalCount': total_count,
+    }
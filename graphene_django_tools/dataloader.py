@@ -1,33 +1,249 @@
 """Data loader for django model.  """
 
+import concurrent.futures
+import functools
 import logging
+import typing
 
+import django.core.exceptions as djce
+import django.db as djdb
+import django.db.models as djm
 from promise import Promise
 from promise.dataloader import DataLoader
 
+from . import queryset, shared_cache
+from .model_field import _get_parent_join_field
+
 LOGGER = logging.getLogger(__name__)
 
+if typing.TYPE_CHECKING:
+    from .instrumentation import Instrumentation
+
+# Default max key count in one query for model loader, None means no limit.
+MAX_BATCH_SIZE: typing.Optional[int] = None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_key_coercer(model) -> typing.Callable[[typing.Any], typing.Any]:
+    """Get function that convert key to primary key value,
+    returns None for invalid key.
+    """
+
+    to_python = model._meta.pk.to_python
+
+    def coerce(v):
+        try:
+            return to_python(v)
+        except djce.ValidationError:
+            return None
+
+    return coerce
+
+
+@functools.lru_cache(maxsize=None)
+def _get_model_cache_key_fn(model) -> typing.Callable[[typing.Any], typing.Hashable]:
+    coerce = _get_key_coercer(model)
+
+    def get_cache_key(v):
+        pk = coerce(v)
+        if pk is None:
+            return v
+        return str(pk)
+
+    return get_cache_key
+
+
+def _load_models(model, keys, optimization=None, instrumentation=None) -> list:
+    coerce = _get_key_coercer(model)
+    pks = [coerce(i) for i in keys]
+    keys = [i for i in pks if i is not None]
+    # Projected objects are incomplete, so not use shared cache for them.
+    cache = shared_cache.get(model) if optimization is None else None
+    result = {}
+    missing_keys = keys
+    if cache:
+        result = cache.get_many(keys)
+        missing_keys = [i for i in keys if i not in result]
+    if missing_keys:
+        LOGGER.debug('load: %s: %s', model, missing_keys)
+        qs = model.objects.all()
+        if optimization is not None:
+            qs = queryset.apply_optimization(qs, optimization)
+        loaded = qs.in_bulk(missing_keys)
+        if cache:
+            cache.set_many(loaded.values())
+        result.update(loaded)
+    if instrumentation is not None:
+        instrumentation.record_loader(
+            model,
+            keys=len(keys),
+            cache_hits=len(keys) - len(missing_keys) if cache else 0,
+            cache_misses=len(missing_keys) if cache else 0,
+        )
+    return [result.get(i) for i in pks]
+
+
+def _close_old_connections(func: typing.Callable) -> typing.Callable:
+    """Wrap function that runs in worker thread,
+    so thread database connections follow `CONN_MAX_AGE` and recover from errors,
+    like django does for each request.
+    """
+
+    @functools.wraps(func)
+    def _func(*args, **kwargs):
+        djdb.close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            djdb.close_old_connections()
+
+    return _func
 
-def _get_model_batch_load_fn(model):
+
+def _iter_chunks(keys: list, size: typing.Optional[int]) -> typing.Iterator[list]:
+    if not size:
+        yield keys
+        return
+    for i in range(0, len(keys), size):
+        yield keys[i:i + size]
+
+
+def _get_model_batch_load_fn(
+        model,
+        optimization=None,
+        max_batch_size: typing.Optional[int] = None,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        instrumentation: typing.Optional['Instrumentation'] = None,
+):
     """Create batch load function for model.  """
 
+    def _load(keys):
+        return _load_models(model, keys, optimization, instrumentation)
+
     def batch_load_fn(keys):
-        keys = [int(i) for i in keys]
-        LOGGER.debug('load: %s: %s', model, keys)
-        result = model.objects.in_bulk(keys)
-        return Promise.resolve([result[i] for i in keys])
+        chunks = list(_iter_chunks(keys, max_batch_size))
+        if executor and len(chunks) > 1:
+            results = executor.map(_close_old_connections(_load), chunks)
+        else:
+            results = map(_load, chunks)
+        return Promise.resolve([j for i in results for j in i])
 
     return batch_load_fn
 
 
-def _get_model_cache_key(v):
-    if isinstance(v, int):
-        return str(v)
-    return v
+def get_for_model(
+        model,
+        *,
+        optimization: 'queryset.Optimization' = None,
+        max_batch_size: typing.Optional[int] = None,
+        executor: typing.Optional[concurrent.futures.Executor] = None,
+        instrumentation: typing.Optional['Instrumentation'] = None,
+):
+    """Create dataloader for model.
+
+    Args:
+        model: Django model.
+        optimization (queryset.Optimization, optional): Optimization result
+            that apply to loader queryset, deferred fields will be loaded on access.
+            Defaults to None.
+        max_batch_size (int, optional): Max key count in one query,
+            larger batch is split to chunks. Defaults to `MAX_BATCH_SIZE`.
+        executor (concurrent.futures.Executor, optional): Run chunks concurrently
+            with executor, each thread use its own database connection,
+            old connections are closed before and after each chunk,
+            so uncommitted data is not visible. Defaults to None.
+        instrumentation (Instrumentation, optional): Record batches to it.
+            Defaults to None.
+
+    Returns:
+        DataLoader: Loader that load primary key to model object.
+    """
+
+    if max_batch_size is None:
+        max_batch_size = MAX_BATCH_SIZE
+    ret = DataLoader(
+        _get_model_batch_load_fn(
+            model, optimization, max_batch_size, executor, instrumentation),
+        get_cache_key=_get_model_cache_key_fn(model),
+    )
+    if instrumentation is not None:
+        instrumentation.track_loader(ret)
+    return ret
+
+
+def _get_relation_batch_load_fn(
+        model,
+        field_name: str,
+        get_model_loader: typing.Optional[typing.Callable[[typing.Any], DataLoader]],
+        instrumentation: typing.Optional['Instrumentation'] = None,
+):
+    """Create batch load function for model relation.  """
+
+    field = model._meta.get_field(field_name)
+    if not (field.one_to_many or field.many_to_many):
+        raise ValueError(
+            f'Relation should be many valued: model={model}, field_name={field_name}')
+    related_model = field.related_model
+    coerce = _get_key_coercer(model)
+    cache_name = field.get_accessor_name() if field.auto_created else field.name
+    join_field = _get_parent_join_field(field)
+
+    def batch_load_fn(keys):
+        keys = [coerce(i) for i in keys]
+        LOGGER.debug('load relation: %s.%s: %s', model, field_name, keys)
+        if join_field is None:
+            # Use unsaved instance as prefetch target,
+            # so django can handle all kind of relation with single query.
+            parents = {i: model(pk=i) for i in keys if i is not None}
+        else:
+            # Relation joins on non primary key field, load its value.
+            parents = {i.pk: i for i in model._base_manager.filter(
+                pk__in=[i for i in keys if i is not None]).only(join_field.attname)}
+        djm.prefetch_related_objects(list(parents.values()), cache_name)
+        if instrumentation is not None:
+            instrumentation.record_loader(related_model, keys=len(parents))
+        ret = [list(getattr(parents[i], cache_name).all()) if i in parents else []
+               for i in keys]
+        if get_model_loader:
+            loader = get_model_loader(related_model)
+            for i in ret:
+                for j in i:
+                    loader.prime(j.pk, j)
+        return Promise.resolve(ret)
+
+    return batch_load_fn
+
+
+def get_for_relation(
+        model,
+        field_name: str,
+        *,
+        get_model_loader: typing.Optional[typing.Callable[[typing.Any], DataLoader]] = None,
+        instrumentation: typing.Optional['Instrumentation'] = None,
+):
+    """Create dataloader for many valued model relation (reverse foreign key or many to many),
+    load parent primary key to related object list.
+
+    Args:
+        model: Parent model.
+        field_name (str): Relation field name or related query name on parent model.
+        get_model_loader (optional): Get loader for related model,
+            related objects will be primed to it.
+        instrumentation (Instrumentation, optional): Record batches to it.
+            Defaults to None.
 
+    Raises:
+        ValueError: Relation is not many valued.
 
-def get_for_model(model):
-    """Create dataloader for model.  """
+    Returns:
+        DataLoader: Loader that load parent primary key to related object list.
+    """
 
-    return DataLoader(_get_model_batch_load_fn(model),
-                      get_cache_key=_get_model_cache_key)
+    ret = DataLoader(
+        _get_relation_batch_load_fn(
+            model, field_name, get_model_loader, instrumentation),
+        get_cache_key=_get_model_cache_key_fn(model),
+    )
+    if instrumentation is not None:
+        instrumentation.track_loader(ret)
+    return ret
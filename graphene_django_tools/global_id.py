@@ -1,10 +1,10 @@
 """Process graphene global id.  """
 
+from binascii import a2b_base64, b2a_base64
 from dataclasses import dataclass
 from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import django.db.models as djm
-import graphene
 
 from . import model_type
 
@@ -13,13 +13,89 @@ class InvalidGlobalIDError(ValueError):
     """Indicate global id is invalid.  """
 
 
+def encode(type_: str, value: Any) -> str:
+    """Encode global id, same format as `graphene.Node.to_global_id`.
+
+    Args:
+        type_ (str): Typename.
+        value (Any): Id value, will be converted to str.
+
+    Returns:
+        str: Encoded global id.
+    """
+
+    return b2a_base64(f'{type_}:{value}'.encode('utf-8'), newline=False).decode('ascii')
+
+
+def decode(v: str) -> Tuple[str, str]:
+    """Decode global id, same format as `graphene.Node.from_global_id`.
+
+    Args:
+        v (str): Encoded global id.
+
+    Raises:
+        TypeError: Value is not a str or bytes.
+        ValueError: Value is not a valid global id.
+
+    Returns:
+        Tuple[str, str]: Typename and id value.
+    """
+
+    type_, sep, value = a2b_base64(v).decode('utf-8').partition(':')
+    if not sep:
+        raise ValueError(f'Missing type separator: {v}')
+    return type_, value
+
+
+def encode_many(items: Iterable[Tuple[str, Any]]) -> List[str]:
+    """Encode multiple global id.
+
+    Args:
+        items (Iterable[Tuple[str, Any]]): Typename and id value pairs.
+
+    Returns:
+        List[str]: Encoded global ids.
+    """
+
+    _b2a_base64 = b2a_base64
+    return [_b2a_base64(f'{type_}:{value}'.encode('utf-8'), newline=False).decode('ascii')
+            for type_, value in items]
+
+
+def decode_many(values: Iterable[str]) -> List[Tuple[str, str]]:
+    """Decode multiple global id.
+
+    Args:
+        values (Iterable[str]): Encoded global ids.
+
+    Raises:
+        TypeError: Value is not a str or bytes.
+        ValueError: Value is not a valid global id.
+
+    Returns:
+        List[Tuple[str, str]]: Typename and id value pairs.
+    """
+
+    ret = []
+    append = ret.append
+    _a2b_base64 = a2b_base64
+    for i in values:
+        type_, sep, value = _a2b_base64(i).decode('utf-8').partition(':')
+        if not sep:
+            raise ValueError(f'Missing type separator: {i}')
+        append((type_, value))
+    return ret
+
+
 @dataclass
 class GlobalID:
+    __slots__ = ('type', 'value')
+
     type: str
     value: str
 
     def __str__(self):
-        return graphene.Node.to_global_id(self.type, self.value)
+        return encode(self.type, self.value)
 
     def validate_type(
             self,
@@ -56,14 +132,10 @@ class GlobalID:
             ID: Parse result
         """
         try:
-
-            type_, id_ = graphene.Node.from_global_id(v)
+            type_, id_ = decode(v)
         except (TypeError, ValueError) as ex:
             raise InvalidGlobalIDError(f'Invalid id: value={v}') from ex
-        return cls(
-            value=id_,
-            type=type_
-        )
+        return cls(type_, id_)
 
     @classmethod
     def from_object(cls, obj: djm.Model) -> 'GlobalID':
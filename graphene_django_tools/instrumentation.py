@@ -0,0 +1,234 @@
+"""Database query instrumentation for graphql execution.
+
+Queries are attributed to graphql field path that triggered them.
+"""
+
+import contextlib
+import logging
+import time
+import typing
+
+import django.db as djdb
+import graphql
+
+if typing.TYPE_CHECKING:
+    from promise.dataloader import DataLoader
+
+LOGGER = logging.getLogger(__name__)
+
+if typing.TYPE_CHECKING:
+    class FieldStats(typing.TypedDict):
+        """Statistics for one graphql field path.  """
+
+        resolves: int
+        queries: int
+        time: float
+
+    class LoaderStats(typing.TypedDict):
+        """Statistics for one model loader.  """
+
+        batches: int
+        keys: int
+        max_batch_size: int
+        cache_hits: int
+        cache_misses: int
+
+    class Report(typing.TypedDict):
+        """Instrumentation report.  """
+
+        fields: typing.Dict[str, FieldStats]
+        loaders: typing.Dict[str, LoaderStats]
+
+
+# Functions that called with report when instrumentation finished,
+# e.g. send report to metrics system.
+HOOKS: typing.List[typing.Callable[['Report'], None]] = []
+
+CONTEXT_ATTNAME = '_django_instrumentation'
+
+
+def _format_path(path: typing.Optional[typing.List[typing.Union[str, int]]]) -> str:
+    # List index is ignored, so list items are aggregated.
+    return '.'.join(i for i in path or () if isinstance(i, str))
+
+
+class Instrumentation:
+    """Collect database query statistics for graphql field and model loader.
+
+    Use as context manager to capture queries,
+    and as graphene middleware to track current field.
+    Use `execute` method to do both.
+    """
+
+    def __init__(self):
+        self.fields: typing.Dict[str, 'FieldStats'] = {}
+        self.loaders: typing.Dict[str, 'LoaderStats'] = {}
+        self._path = ''
+        self._exit_stack: typing.Optional[contextlib.ExitStack] = None
+
+    def _get_field_stats(self, path: str) -> 'FieldStats':
+        if path not in self.fields:
+            self.fields[path] = {
+                'resolves': 0,
+                'queries': 0,
+                'time': 0.0,
+            }
+        return self.fields[path]
+
+    @contextlib.contextmanager
+    def _use_path(self, path: str):
+        previous_path = self._path
+        self._path = path
+        try:
+            yield
+        finally:
+            self._path = previous_path
+
+    def resolve(self, next_, root, info: graphql.ResolveInfo, **kwargs):
+        """Graphene middleware resolve function.  """
+
+        path = _format_path(info.path)
+        self._get_field_stats(path)['resolves'] += 1
+        with self._use_path(path):
+            return next_(root, info, **kwargs)
+
+    def track_loader(self, loader: 'DataLoader') -> 'DataLoader':
+        """Attribute loader batch queries to field paths that load keys.
+
+        Args:
+            loader (DataLoader): Loader to track.
+
+        Returns:
+            DataLoader: Same loader.
+        """
+
+        paths: typing.Set[str] = set()
+        load = loader.load
+        batch_load_fn = loader.batch_load_fn
+
+        def _load(key):
+            paths.add(self._path)
+            return load(key)
+
+        def _batch_load_fn(keys):
+            path = ','.join(sorted(paths))
+            paths.clear()
+            with self._use_path(path):
+                return batch_load_fn(keys)
+
+        loader.load = _load
+        loader.batch_load_fn = _batch_load_fn
+        return loader
+
+    def _execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats = self._get_field_stats(self._path)
+            stats['queries'] += 1
+            stats['time'] += time.perf_counter() - start
+
+    def record_loader(
+            self,
+            model,
+            *,
+            keys: int,
+            cache_hits: int = 0,
+            cache_misses: int = 0,
+    ) -> None:
+        """Record one model loader batch.
+
+        Args:
+            model: Django model.
+            keys (int): Key count in batch.
+            cache_hits (int, optional): Shared cache hit count. Defaults to 0.
+            cache_misses (int, optional): Shared cache miss count. Defaults to 0.
+        """
+
+        label = model._meta.label
+        if label not in self.loaders:
+            self.loaders[label] = {
+                'batches': 0,
+                'keys': 0,
+                'max_batch_size': 0,
+                'cache_hits': 0,
+                'cache_misses': 0,
+            }
+        stats = self.loaders[label]
+        stats['batches'] += 1
+        stats['keys'] += keys
+        stats['max_batch_size'] = max(stats['max_batch_size'], keys)
+        stats['cache_hits'] += cache_hits
+        stats['cache_misses'] += cache_misses
+
+    def get_report(self) -> 'Report':
+        """Get collected statistics.
+
+        Returns:
+            Report: Statistics for fields and loaders.
+        """
+
+        return {
+            'fields': {k: dict(v) for k, v in self.fields.items()},  # type: ignore
+            'loaders': {k: dict(v) for k, v in self.loaders.items()},  # type: ignore
+        }
+
+    def __enter__(self) -> 'Instrumentation':
+        self._exit_stack = contextlib.ExitStack()
+        for conn in djdb.connections.all():
+            self._exit_stack.enter_context(
+                conn.execute_wrapper(self._execute_wrapper))
+        return self
+
+    def __exit__(self, *exc_info):
+        assert self._exit_stack is not None
+        self._exit_stack.close()
+        self._exit_stack = None
+        report = self.get_report()
+        LOGGER.debug('graphql instrumentation', extra={'report': report})
+        for hook in HOOKS:
+            hook(report)
+
+    def execute(
+            self,
+            schema,
+            *args,
+            context_value=None,
+            middleware: typing.Sequence = (),
+            **kwargs,
+    ) -> graphql.execution.ExecutionResult:
+        """Execute schema with instrumentation,
+        report is added to result extensions with `instrumentation` key.
+
+        Args:
+            schema (graphene.Schema): Schema to execute.
+            context_value (optional): Execution context,
+                instrumentation is attached to it for data loaders.
+            middleware (typing.Sequence, optional): Other middlewares.
+
+        Returns:
+            graphql.execution.ExecutionResult: Execution result.
+        """
+
+        if context_value is not None:
+            setattr(context_value, CONTEXT_ATTNAME, self)
+        with self:
+            ret = schema.execute(
+                *args,
+                context_value=context_value,
+                middleware=[self, *middleware],
+                **kwargs,
+            )
+        ret.extensions['instrumentation'] = self.get_report()
+        return ret
+
+
+def get_for_context(context) -> typing.Optional[Instrumentation]:
+    """Get instrumentation attached to execution context.
+
+    Returns:
+        typing.Optional[Instrumentation]: Instrumentation, None if not attached.
+    """
+
+    return getattr(context, CONTEXT_ATTNAME, None)
@@ -0,0 +1,223 @@
+"""Model field and lookup helpers for queryset optimization.  """
+
+import typing
+
+import django.db.models as djm
+import phrases_case
+from django.core.exceptions import FieldDoesNotExist
+
+
+class _ModelFieldIndex:
+    """Lazily resolved field lookup index for a model.
+
+    Results (including missing fields) are memoized,
+    and index is rebuilt when model meta cache expired by app registry change.
+    """
+
+    def __init__(self, model: typing.Type[djm.Model]):
+        self.model = model
+        self.stamp = _get_model_meta_stamp(model)
+        self.fields: typing.Dict[str, typing.Optional[djm.Field]] = {}
+        self.only_lookups: typing.Dict[
+            typing.Tuple[str, str], typing.List[str]] = {}
+
+    def get_field(self, name: str) -> typing.Optional[djm.Field]:
+        """Get field by name, returns None when field not exists.  """
+
+        try:
+            return self.fields[name]
+        except KeyError:
+            pass
+        try:
+            ret = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            ret = None
+        self.fields[name] = ret
+        return ret
+
+    def is_expired(self) -> bool:
+        """Whether model meta cache expired after index created.  """
+
+        return any(a is not b for a, b in zip(
+            self.stamp, _get_model_meta_stamp(self.model)))
+
+
+_FIELD_INDEX: typing.Dict[typing.Type[djm.Model], _ModelFieldIndex] = {}
+
+
+def _get_model_meta_stamp(model: typing.Type[djm.Model]) -> typing.Tuple[dict, dict]:
+    # Both map are cached property that recreated after `Options._expire_cache`.
+    meta = model._meta
+    return (meta._forward_fields_map, meta.fields_map)
+
+
+def _get_field_index(model: typing.Type[djm.Model]) -> _ModelFieldIndex:
+    ret = _FIELD_INDEX.get(model)
+    if ret is None or ret.is_expired():
+        ret = _ModelFieldIndex(model)
+        _FIELD_INDEX[model] = ret
+    return ret
+
+
+def _format_related_name(related_query_name, name):
+    if related_query_name == 'self':
+        return name
+    return f'{related_query_name}__{name}'
+
+
+def _get_model_field(model: typing.Type[djm.Model], lookup: str) -> typing.Optional[djm.Field]:
+    _model = model
+    field = None
+    for i in lookup.split('__'):
+        if _model is None:
+            return None
+        field = _get_field_index(_model).get_field(i)
+        if field is None:
+            return None
+        _model = field.related_model
+    return field
+
+
+def _iter_lookup_fields(
+        model: typing.Optional[typing.Type[djm.Model]],
+        lookup: str,
+) -> typing.Iterator[typing.Optional[djm.Field]]:
+    for i in lookup.split('__'):
+        field = None if model is None else _get_field_index(model).get_field(i)
+        yield field
+        if field is None:
+            return
+        model = field.related_model
+
+
+def _get_related_model(model, related_query_name: str):
+    if model is None or related_query_name == 'self':
+        return model
+    field = _get_model_field(model, related_query_name)
+    return field and field.related_model
+
+
+def _get_default_only_lookups(
+        fieldname: str, model: typing.Type[djm.Model], related_query_name: str) -> typing.List[str]:
+    index = _get_field_index(model)
+    key = (related_query_name, fieldname)
+    try:
+        return index.only_lookups[key]
+    except KeyError:
+        pass
+
+    field = None
+    for lookup in (
+            _format_related_name(related_query_name, fieldname),
+            _format_related_name(related_query_name,
+                                 phrases_case.snake(fieldname)),
+    ):
+        field = _get_model_field(model, lookup) or field
+
+    ret = []
+    if field is not None and hasattr(field, 'attname'):
+        ret = [field.attname]
+    index.only_lookups[key] = ret
+    return ret
+
+
+def _is_single_valued(model: typing.Type[djm.Model], lookup: str) -> bool:
+    for i in lookup.split('__'):
+        field = _get_field_index(model).get_field(i)
+        if (field is None
+                or field.related_model is None
+                or not (field.many_to_one or field.one_to_one)):
+            return False
+        model = field.related_model
+    return True
+
+
+def _get_join_only_lookups(model: typing.Type[djm.Model], lookup: str) -> typing.List[str]:
+    ret = []
+    prefix = 'self'
+    for i in lookup.split('__'):
+        field = _get_field_index(model).get_field(i)
+        if field.concrete:
+            ret.append(_format_related_name(prefix, field.attname))
+        prefix = _format_related_name(prefix, i)
+        model = field.related_model
+    return ret
+
+
+def _get_prefetch_join_lookups(field) -> typing.List[str]:
+    """Lookups that prefetched object requires to match its parent.  """
+
+    if getattr(field, 'object_id_field_name', None):
+        # Generic relation.
+        content_type_field = field.related_model._meta.get_field(
+            field.content_type_field_name)
+        return [field.object_id_field_name, content_type_field.attname]
+    if field.auto_created and not field.many_to_many:
+        # Reverse foreign key or one to one.
+        return [field.field.attname]
+    return []
+
+
+def _get_parent_join_field(field) -> typing.Optional[djm.Field]:
+    """Field on parent model that many valued relation joins on,
+    None for primary key.
+    """
+
+    if getattr(field, 'object_id_field_name', None):
+        # Generic relation.
+        return None
+    if field.many_to_many:
+        if field.auto_created:
+            # Reverse many to many.
+            ret = field.model._meta.get_field(field.field.m2m_reverse_target_field_name())
+        else:
+            ret = field.model._meta.get_field(field.m2m_target_field_name())
+    else:
+        ret = field.field.target_field
+    return None if ret.primary_key else ret
+
+
+class _LookupTrie:
+    """Set of lookup paths stored as trie.  """
+
+    def __init__(self, lookups: typing.Iterable[str] = ()):
+        self.children: typing.Dict[str, '_LookupTrie'] = {}
+        for i in lookups:
+            self.add(i)
+
+    def add(self, lookup: str) -> None:
+        """Add lookup path.  """
+
+        node = self
+        for i in lookup.split('__'):
+            node = node.children.setdefault(i, _LookupTrie())
+
+    def __contains__(self, lookup: str) -> bool:
+        """Whether lookup is a added path or prefix of it.  """
+
+        node = self
+        for i in lookup.split('__'):
+            if i not in node.children:
+                return False
+            node = node.children[i]
+        return True
+
+    def is_leaf(self, lookup: str) -> bool:
+        """Whether lookup is a added path and not prefix of other path.  """
+
+        node = self
+        for i in lookup.split('__'):
+            if i not in node.children:
+                return False
+            node = node.children[i]
+        return not node.children
+
+    def iter_leaves(self, prefix: str = '') -> typing.Iterator[str]:
+        """Iterate longest paths, prefixes are collapsed.  """
+
+        for k, v in self.children.items():
+            path = _format_related_name(prefix, k) if prefix else k
+            if v.children:
+                yield from v.iter_leaves(path)
+            else:
+                yield path
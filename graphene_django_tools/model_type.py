@@ -1,17 +1,74 @@
 """handle relationship between django model and graphene type. """
 
 import typing
-from functools import lru_cache
 
 import django.db.models as djm
+import graphene_resolver
 
 if typing.TYPE_CHECKING:
     import django.contrib.contenttypes.models as ctm
 
-REGISTRY: typing.Dict[typing.Type[djm.Model], str] = {}
+
+class Registry(typing.MutableMapping[typing.Type[djm.Model], str]):
+    """Bidirectional mapping between django model and graphql typename.
+
+    Use as a `model -> typename` mapping,
+    reverse lookup and inheritance lookup are indexed.
+    """
+
+    def __init__(self):
+        self._typenames: typing.Dict[typing.Type[djm.Model], str] = {}
+        self._models: typing.Dict[str, typing.List[typing.Type[djm.Model]]] = {}
+        self._resolved: typing.Dict[typing.Type[djm.Model], typing.Optional[str]] = {}
+
+    def __getitem__(self, key: typing.Type[djm.Model]) -> str:
+        return self._typenames[key]
+
+    def __setitem__(self, key: typing.Type[djm.Model], value: str) -> None:
+        if key in self._typenames:
+            del self[key]
+        self._typenames[key] = value
+        self._models.setdefault(value, []).append(key)
+        self._resolved.clear()
+
+    def __delitem__(self, key: typing.Type[djm.Model]) -> None:
+        typename = self._typenames.pop(key)
+        models = self._models[typename]
+        models.remove(key)
+        if not models:
+            del self._models[typename]
+        self._resolved.clear()
+
+    def __iter__(self) -> typing.Iterator[typing.Type[djm.Model]]:
+        return iter(self._typenames)
+
+    def __len__(self) -> int:
+        return len(self._typenames)
+
+    def get_models(self, typename: str) -> typing.List[typing.Type[djm.Model]]:
+        """Get models registered for typename.  """
+
+        return list(self._models.get(typename, ()))
+
+    def get_typename(self, model: typing.Type[djm.Model]) -> typing.Optional[str]:
+        """Get typename for model or its nearest registered base class.  """
+
+        try:
+            return self._resolved[model]
+        except KeyError:
+            pass
+        ret = None
+        for i in model.__mro__:
+            if i in self._typenames:
+                ret = self._typenames[i]
+                break
+        self._resolved[model] = ret
+        return ret
+
+
+REGISTRY = Registry()
 
 
-@lru_cache()
 def get_models(v: str) -> typing.List[typing.Type[djm.Model]]:
     """Get models for typename.
 
@@ -22,11 +79,7 @@ def get_models(v: str) -> typing.List[typing.Type[djm.Model]]:
         typing.List[djm.Model]: list of models that registered for this typename.
     """
 
-    ret = []
-    for model, typename in REGISTRY.items():
-        if typename == v:
-            ret.append(model)
-    return ret
+    return REGISTRY.get_models(v)
 
 
 def get_model(typename: str) -> typing.Type[djm.Model]:
@@ -42,14 +95,13 @@ def get_model(typename: str) -> typing.Type[djm.Model]:
         typing.Type[djm.Model]: Model registered for given typename.
     """
 
-    models = get_models(typename)
+    models = REGISTRY.get_models(typename)
     if len(models) != 1:
         raise ValueError(
             f"Can not determinate model from typename: typename={typename}")
     return models[0]
 
 
-@lru_cache()
 def get_typename(model: typing.Type[djm.Model]) -> str:
     """Get typename for model, support inheritance.
 
@@ -63,15 +115,11 @@ def get_typename(model: typing.Type[djm.Model]) -> str:
         str: Typename for this model.
     """
 
-    if model in REGISTRY:
-        return REGISTRY[model]
-
-    for k, v in REGISTRY.items():
-        if issubclass(model, k):
-            return v
-
-    raise ValueError(
-        f'No typename has not registed for: {repr(model)}')
+    ret = REGISTRY.get_typename(model)
+    if ret is None:
+        raise ValueError(
+            f'No typename has not registed for: {repr(model)}')
+    return ret
 
 
 def get_content_type(typename: str) -> 'ctm.ContentType':
@@ -91,3 +139,14 @@ def get_content_type(typename: str) -> 'ctm.ContentType':
     import django.contrib.contenttypes.models as ctm
     model = get_model(typename)
     return ctm.ContentType.objects.get_for_model(model)
+
+
+@graphene_resolver.TYPENAME_PROCESSOR.register(0)
+def _resolve_model_typename(value) -> typing.Optional[dict]:
+    # Resolve concrete type of interface and union for model instance.
+    if not isinstance(value, djm.Model):
+        return None
+    typename = REGISTRY.get_typename(type(value))
+    if typename is None:
+        return None
+    return {'__typename': typename}
@@ -0,0 +1,132 @@
+"""Detect N+1 queries during graphql execution.  """
+
+import collections
+import dataclasses
+import logging
+import typing
+
+import django.db.models as djm
+import graphql
+import phrases_case
+
+from .instrumentation import Instrumentation, _format_path
+from .model_field import _get_model_field
+
+LOGGER = logging.getLogger(__name__)
+
+# Raise `NPlusOneError` when detector strict option is not specified,
+# enable it in test settings to catch regressions.
+STRICT = False
+
+
+@dataclasses.dataclass
+class Issue:
+    """Repeated query from same field path.  """
+
+    path: str
+    sql: str
+    count: int
+    suggestion: str
+
+    def __str__(self):
+        return f'{self.path}: {self.count} queries: {self.sql}\n  {self.suggestion}'
+
+
+class NPlusOneError(Exception):
+    """N+1 queries detected in strict mode.  """
+
+    def __init__(self, issues: typing.List[Issue]):
+        super().__init__('N+1 queries detected:\n' + '\n'.join(str(i) for i in issues))
+        self.issues = issues
+
+
+def _get_suggestion(
+        typename: str,
+        fieldname: str,
+        model: typing.Optional[typing.Type[djm.Model]],
+) -> str:
+    default = 'Use `Resolver.get_loader` to batch queries.'
+    if model is None:
+        return default
+    field = (_get_model_field(model, fieldname)
+             or _get_model_field(model, phrases_case.snake(fieldname)))
+    if field is None or not field.is_relation:
+        return default
+    lookup = field.get_accessor_name() if field.auto_created else field.name
+    related_model = field.related_model.__name__
+    if field.many_to_one or field.one_to_one:
+        return (
+            f"Add `OPTIMIZATION_OPTIONS['{typename}'] = "
+            f"{{'select': {{'{fieldname}': ['{lookup}']}}, "
+            f"'related': {{'{fieldname}': '{lookup}'}}}}`, "
+            f"or load it with `Resolver.get_loader({related_model})`."
+        )
+    return (
+        f"Add `OPTIMIZATION_OPTIONS['{typename}'] = "
+        f"{{'prefetch': {{'{fieldname}': ['{lookup}']}}, "
+        f"'related': {{'{fieldname}': '{lookup}'}}}}`, "
+        f"or load it with `Resolver.get_loader({model.__name__}, '{lookup}')`."
+    )
+
+
+class Detector(Instrumentation):
+    """Instrumentation that detect queries repeated with only parameters changed
+    from same field path.
+
+    Args:
+        threshold (int, optional): Min repeat count to report. Defaults to 2.
+        strict (bool, optional): Raise `NPlusOneError` on exit when issue detected.
+            Defaults to `STRICT`.
+    """
+
+    def __init__(self, *, threshold: int = 2, strict: typing.Optional[bool] = None):
+        super().__init__()
+        self.threshold = threshold
+        self.strict = STRICT if strict is None else strict
+        self._queries: typing.Dict[typing.Tuple[str, str],
+                                   int] = collections.defaultdict(int)
+        self._field_info: typing.Dict[str, typing.Tuple[
+            str, str, typing.Optional[typing.Type[djm.Model]]]] = {}
+
+    def resolve(self, next_, root, info: graphql.ResolveInfo, **kwargs):
+        path = _format_path(info.path)
+        if path not in self._field_info:
+            self._field_info[path] = (
+                info.parent_type.name,
+                info.field_name,
+                type(root) if isinstance(root, djm.Model) else None,
+            )
+        return super().resolve(next_, root, info, **kwargs)
+
+    def _execute_wrapper(self, execute, sql, params, many, context):
+        if not many:
+            self._queries[(self._path, sql)] += 1
+        return super()._execute_wrapper(execute, sql, params, many, context)
+
+    def get_issues(self) -> typing.List[Issue]:
+        """Get detected issues.
+
+        Returns:
+            typing.List[Issue]: Issues.
+        """
+
+        ret = []
+        for (path, sql), count in self._queries.items():
+            if count < self.threshold:
+                continue
+            if path in self._field_info:
+                suggestion = _get_suggestion(*self._field_info[path])
+            elif ',' in path:
+                suggestion = 'Loader batch is dispatched repeatedly, load keys together.'
+            else:
+                suggestion = 'Resolve field with optimized queryset or data loader.'
+            ret.append(Issue(path=path, sql=sql, count=count, suggestion=suggestion))
+        return ret
+
+    def __exit__(self, *exc_info):
+        super().__exit__(*exc_info)
+        issues = self.get_issues()
+        for i in issues:
+            LOGGER.warning('N+1 queries: %s', i)
+        if issues and self.strict and exc_info[0] is None:
+            raise NPlusOneError(issues)
@@ -0,0 +1,232 @@
+"""Optimization result processing.  """
+
+import collections
+import logging
+import typing
+
+import django.db.models as djm
+
+from .model_field import (_format_related_name, _get_field_index,
+                          _get_join_only_lookups, _is_single_valued,
+                          _LookupTrie)
+
+if typing.TYPE_CHECKING:
+    from .queryset import Optimization
+
+LOGGER = logging.getLogger(__name__)
+
+
+class _OptimizedPrefetch(djm.Prefetch):
+    """Prefetch that queryset is optimized from sub selection.  """
+
+    def __init__(self, lookup: str, model: typing.Type[djm.Model], optimization: 'Optimization'):
+        self.model = model
+        self.optimization = optimization
+        super().__init__(lookup, queryset=apply_optimization(
+            model._default_manager.all(), optimization))
+
+    def with_prefix(self, prefix: str) -> '_OptimizedPrefetch':
+        """Get copy with lookup prefixed.  """
+
+        return _OptimizedPrefetch(
+            _format_related_name(prefix, self.prefetch_to),
+            self.model,
+            self.optimization,
+        )
+
+
+def apply_optimization(
+        queryset: djm.QuerySet,
+        optimization: 'Optimization',
+) -> djm.QuerySet:
+    """Apply optimization result to queryset.
+
+    Args:
+        queryset (djm.QuerySet): Queryset to optimize.
+        optimization (Optimization): Optimization result.
+
+    Returns:
+        djm.QuerySet: optimized queryset.
+    """
+
+    LOGGER.debug("Optimization queryset: optimization=%s, model=%s",
+                 optimization, queryset.model)
+    qs = queryset
+    if optimization['select']:
+        qs = qs.select_related(*optimization['select'])
+    if optimization['prefetch']:
+        qs = qs.prefetch_related(*optimization['prefetch'])
+    qs = qs.only(*optimization['only'], *optimization['select'])
+    if optimization.get('annotate'):
+        qs = qs.annotate(**optimization['annotate'])
+    return qs
+
+
+def _merge_prefetch(
+        items: typing.Iterable[typing.Union[str, djm.Prefetch]],
+) -> typing.List[typing.Union[str, djm.Prefetch]]:
+    """Merge optimized prefetch for same lookup,
+    django not allow same lookup with different queryset.
+    """
+
+    ret: typing.Dict[str, typing.Union[str, djm.Prefetch]] = {}
+    for i in items:
+        if not isinstance(i, _OptimizedPrefetch):
+            key = i.prefetch_to if isinstance(i, djm.Prefetch) else i
+            # Prefetch object replaces plain lookup.
+            if isinstance(i, djm.Prefetch) and isinstance(ret.get(key), str):
+                del ret[key]
+            ret.setdefault(key, i)
+            continue
+        existing = ret.get(i.prefetch_to)
+        if isinstance(existing, _OptimizedPrefetch):
+            optimization: Optimization = {
+                'only': [*existing.optimization['only'], *i.optimization['only']],
+                'select': [*existing.optimization['select'], *i.optimization['select']],
+                'prefetch': [*existing.optimization['prefetch'], *i.optimization['prefetch']],
+                'annotate': {
+                    **existing.optimization.get('annotate', {}),
+                    **i.optimization.get('annotate', {}),
+                },
+            }
+            i = _OptimizedPrefetch(
+                i.prefetch_to, i.model, _normalize_optimization(optimization, i.model))
+        ret[i.prefetch_to] = i
+    return list(ret.values())
+
+
+def _warn_deferred_prefetch(
+        model: typing.Type[djm.Model],
+        lookup: str,
+        only: typing.Collection[str],
+        select: _LookupTrie,
+) -> None:
+    # Prefetch through a deferred foreign key loads it for each object.
+    name = lookup.split('__', 1)[0]
+    field = _get_field_index(model).get_field(name)
+    if (field is None
+            or not field.concrete
+            or not (field.many_to_one or field.one_to_one)):
+        return
+    if name in select or field.attname in only or name in only:
+        return
+    LOGGER.warning(
+        'Prefetch lookup requires deferred field, '
+        'it will be loaded with one query for each object: '
+        'model=%s, lookup=%s, field=%s',
+        model, lookup, field.attname)
+
+
+def _normalize_optimization(
+        optimization: 'Optimization',
+        model: typing.Type[djm.Model],
+) -> 'Optimization':
+    """Drop duplicated and redundant lookups,
+    and convert prefetch of single valued relation to select.
+    """
+
+    select = _LookupTrie(optimization['select'])
+    only = list(optimization['only'])
+    queue = collections.deque(optimization['prefetch'])
+    prefetch: typing.List[typing.Union[str, djm.Prefetch]] = []
+    while queue:
+        i = queue.popleft()
+        lookup = i.prefetch_to if isinstance(i, djm.Prefetch) else i
+        if (not _is_single_valued(model, lookup)
+                # Annotation can only apply to prefetch queryset.
+                or (isinstance(i, _OptimizedPrefetch) and i.optimization.get('annotate'))):
+            prefetch.append(i)
+            continue
+        select.add(lookup)
+        if only:
+            # Selected relation can not be deferred.
+            only.extend(_get_join_only_lookups(model, lookup))
+        if isinstance(i, _OptimizedPrefetch):
+            only.extend(_format_related_name(lookup, j)
+                        for j in i.optimization['only'])
+            for j in i.optimization['select']:
+                select.add(_format_related_name(lookup, j))
+            queue.extend(
+                j.with_prefix(lookup) if isinstance(j, _OptimizedPrefetch)
+                else _format_related_name(lookup, j)
+                for j in i.optimization['prefetch']
+            )
+
+    # Lookups across not selected relation are not used by django.
+    only = list(dict.fromkeys(
+        i for i in only
+        if '__' not in i or i.rsplit('__', 1)[0] in select
+    ))
+    prefetch = _merge_prefetch(prefetch)
+    # Plain lookup is implied by any longer lookup.
+    prefetch_lookups = _LookupTrie(
+        i.prefetch_to if isinstance(i, djm.Prefetch) else i for i in prefetch)
+    prefetch = [
+        i for i in prefetch
+        if isinstance(i, djm.Prefetch) or prefetch_lookups.is_leaf(i)
+    ]
+    # Parent lookup should be prefetched first.
+    prefetch.sort(key=lambda v: (v.prefetch_to if isinstance(
+        v, djm.Prefetch) else v).count('__'))
+    if only:
+        for i in prefetch:
+            _warn_deferred_prefetch(
+                model,
+                i.prefetch_to if isinstance(i, djm.Prefetch) else i,
+                only,
+                select,
+            )
+    return {
+        'only': only,
+        'select': list(select.iter_leaves()),
+        'prefetch': prefetch,
+        'annotate': dict(optimization.get('annotate') or {}),
+    }
+
+
+def _get_projection(optimization: 'Optimization') -> typing.Tuple:
+    """Get hashable description of data loaded by optimization,
+    only is None when all fields are loaded.
+    """
+
+    def _get_nested(item):
+        if isinstance(item, _OptimizedPrefetch):
+            return _get_projection(item.optimization)
+        if isinstance(item, djm.Prefetch):
+            # `Prefetch` equality only use lookup.
+            return ('queryset', item.queryset)
+        return (None, frozenset(), frozenset(), frozenset())
+
+    return (
+        # Queryset `only` use both, so all fields are loaded when both empty.
+        None if not (optimization['only'] or optimization['select'])
+        else frozenset(optimization['only']),
+        frozenset(optimization['select']),
+        frozenset(optimization.get('annotate') or ()),
+        frozenset(
+            (i.prefetch_to if isinstance(i, djm.Prefetch) else i, _get_nested(i))
+            for i in optimization['prefetch']
+        ),
+    )
+
+
+def _is_projection_covered(projection: typing.Tuple, other: typing.Tuple) -> bool:
+    """Whether data of projection is all loaded by another projection.  """
+
+    only, *fields, prefetch = projection
+    other_only, *other_fields, other_prefetch = other
+    if other_only is not None and (only is None or not other_only >= only):
+        return False
+    if not all(a >= b for a, b in zip(other_fields, fields)):
+        return False
+    other_prefetch = dict(other_prefetch)
+    for lookup, nested in prefetch:
+        if lookup not in other_prefetch:
+            return False
+        other_nested = other_prefetch[lookup]
+        if nested == other_nested:
+            continue
+        if (nested[0] == 'queryset' or other_nested[0] == 'queryset'
+                or not _is_projection_covered(nested, other_nested)):
+            return False
+    return True
@@ -0,0 +1,184 @@
+"""Optimization option lookup and registration.  """
+
+import threading
+import types
+import typing
+
+import django.db.models as djm
+import phrases_case
+
+from .model_field import _get_field_index, _is_single_valued
+from .optimization_option_validation import OPTION_KINDS, compile_option
+
+if typing.TYPE_CHECKING:
+    from .queryset import OptimizationOption
+
+
+class _OptionDict(dict):
+    """Dict that freeze item with `compile_option` on assignment,
+    and increase `version` on every top level modification.
+
+    Item can not be modified in place, so cached optimization plan never goes stale.
+    """
+
+    version = 0
+
+    def _bump(self):
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, compile_option(key, value, None, None))
+        self._bump()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._bump()
+
+    def clear(self):
+        super().clear()
+        self._bump()
+
+    def pop(self, *args):
+        ret = super().pop(*args)
+        self._bump()
+        return ret
+
+    def popitem(self):
+        ret = super().popitem()
+        self._bump()
+        return ret
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+
+OPTIMIZATION_OPTIONS: typing.MutableMapping[str, 'OptimizationOption'] = _OptionDict()
+_EMPTY_OPTION = compile_option('', {}, None, None)
+
+# Options registered by `register_optimization_option`,
+# replaced as a whole on registration so readers never see partial update.
+_REGISTERED_OPTIONS: typing.Mapping[str, 'OptimizationOption'] = types.MappingProxyType({})
+_REGISTERED_OPTIONS_VERSION = 0
+_REGISTERED_OPTIONS_LOCK = threading.Lock()
+
+
+def get_optimization_option(typename: str) -> 'OptimizationOption':
+    """Get optimization options from typename.
+
+    Field in `OPTIMIZATION_OPTIONS` item is preferred over registered option.
+    Returned option is read-only.
+
+    Args:
+        typename (str): Graphql typename.
+
+    Returns:
+        OptimizationOption: Options.
+    """
+
+    registered = _REGISTERED_OPTIONS.get(typename)
+    ret = OPTIMIZATION_OPTIONS.get(typename)
+    if ret is None:
+        return registered or _EMPTY_OPTION
+    if registered is not None:
+        return {  # type: ignore
+            k: {**registered[k], **ret[k]}  # type: ignore
+            for k in OPTION_KINDS
+        }
+    return ret
+
+
+def infer_optimization_option(
+        model: typing.Type[djm.Model],
+        fieldnames: typing.Iterable[str],
+) -> 'OptimizationOption':
+    """Infer optimization option from model relations.
+
+    Field that match forward foreign key or one-to-one relation is selected,
+    field that match many valued relation is prefetched,
+    both use the relation as related query name.
+
+    Args:
+        model (typing.Type[djm.Model]): Model of the type.
+        fieldnames (typing.Iterable[str]): Graphql field names that not scalar.
+
+    Returns:
+        OptimizationOption: Inferred option.
+    """
+
+    ret: OptimizationOption = {
+        'only': {},
+        'select': {},
+        'prefetch': {},
+        'related': {},
+        'annotate': {},
+    }
+    index = _get_field_index(model)
+    for fieldname in fieldnames:
+        name = phrases_case.snake(fieldname)
+        field = index.get_field(name)
+        if (field is None
+                or field.name != name
+                or not field.is_relation
+                or field.related_model is None):
+            continue
+        if _is_single_valued(model, name):
+            ret['select'][fieldname] = [name]
+        elif (field.get_accessor_name()
+              if hasattr(field, 'get_accessor_name') else name) == name:
+            ret['prefetch'][fieldname] = [name]
+        else:
+            # Prefetch lookup differs from related query name.
+            continue
+        ret['related'][fieldname] = name
+    return ret
+
+
+def register_optimization_option(
+        typename: str,
+        option: typing.Mapping[str, typing.Any],
+        *,
+        model: typing.Optional[typing.Type[djm.Model]] = None,
+        fieldnames: typing.Optional[typing.Collection[str]] = None,
+) -> 'OptimizationOption':
+    """Validate and register optimization option for typename.
+    Registered option is read-only, lookups are validated against model when specified.
+
+    Args:
+        typename (str): Graphql typename.
+        option (typing.Mapping[str, typing.Any]): Option in `OptimizationOption` format.
+        model (typing.Optional[typing.Type[djm.Model]], optional): Model of the type.
+            Defaults to None.
+        fieldnames (typing.Optional[typing.Collection[str]], optional):
+            Field names of the type. Defaults to None.
+
+    Raises:
+        OptimizationOptionError: When option is invalid.
+
+    Returns:
+        OptimizationOption: Registered option.
+    """
+
+    global _REGISTERED_OPTIONS, _REGISTERED_OPTIONS_VERSION  # pylint:disable=global-statement
+    ret = compile_option(typename, option, model, fieldnames)
+    with _REGISTERED_OPTIONS_LOCK:
+        _REGISTERED_OPTIONS = types.MappingProxyType({
+            **_REGISTERED_OPTIONS,
+            typename: ret,
+        })
+        _REGISTERED_OPTIONS_VERSION += 1
+    return ret
+
+
+def clear_registered_options() -> None:
+    """Remove all options registered by `register_optimization_option`.  """
+
+    global _REGISTERED_OPTIONS, _REGISTERED_OPTIONS_VERSION  # pylint:disable=global-statement
+    with _REGISTERED_OPTIONS_LOCK:
+        _REGISTERED_OPTIONS = types.MappingProxyType({})
+        _REGISTERED_OPTIONS_VERSION += 1
@@ -0,0 +1,107 @@
+"""Optimization option validation.  """
+
+import types
+import typing
+
+import django.db.models as djm
+import phrases_case
+
+from .model_field import _get_field_index, _is_single_valued, _iter_lookup_fields
+
+if typing.TYPE_CHECKING:
+    from .queryset import OptimizationOption
+
+OPTION_KINDS = ('only', 'select', 'prefetch', 'related', 'annotate')
+
+
+class OptimizationOptionError(ValueError):
+    """Optimization option is not valid.  """
+
+
+def _validate_lookup(model: typing.Type[djm.Model], kind: str, lookup: str) -> typing.Optional[str]:
+    fields = list(_iter_lookup_fields(model, lookup))
+    if fields[-1] is None or len(fields) != len(lookup.split('__')):
+        return 'field not exists'
+    if kind == 'only':
+        if any(not i.is_relation for i in fields[:-1]):
+            return 'lookup across non-relation field'
+    elif kind == 'select':
+        if not _is_single_valued(model, lookup):
+            return 'not a foreign key or one-to-one relation'
+    elif not all(i.is_relation for i in fields):
+        return 'not a relation'
+    return None
+
+
+def _iter_annotation_errors(
+        model: typing.Optional[typing.Type[djm.Model]],
+        annotations: typing.Any,
+) -> typing.Iterator[typing.Tuple[str, str]]:
+    if not isinstance(annotations, typing.Mapping):
+        yield '*', f'expect alias to expression map, got: {annotations!r}'
+        return
+    for alias, expression in annotations.items():
+        if not hasattr(expression, 'resolve_expression'):
+            yield alias, f'not a expression: {expression!r}'
+        elif model is not None and _get_field_index(model).get_field(alias) is not None:
+            yield alias, f'conflicts with field on {model._meta.label}'
+
+
+def compile_option(
+        typename: str,
+        option: typing.Mapping[str, typing.Any],
+        model: typing.Optional[typing.Type[djm.Model]],
+        fieldnames: typing.Optional[typing.Collection[str]],
+) -> 'OptimizationOption':
+    """Validate option and convert it to read-only.
+
+    Args:
+        typename (str): Graphql typename, used in error message.
+        option (typing.Mapping[str, typing.Any]): Option in `OptimizationOption` format.
+        model (typing.Optional[typing.Type[djm.Model]]): Model to validate lookups against.
+        fieldnames (typing.Optional[typing.Collection[str]]): Field names of the type.
+
+    Raises:
+        OptimizationOptionError: When option is invalid.
+
+    Returns:
+        OptimizationOption: Read-only option.
+    """
+
+    errors = [f'unknown option: {i}' for i in option if i not in OPTION_KINDS]
+    ret: typing.Dict[str, typing.Mapping] = {}
+    for kind in OPTION_KINDS:
+        value: typing.Dict[typing.Optional[str], typing.Any] = {}
+        for k, v in (option.get(kind) or {}).items():
+            if (k is not None
+                    and fieldnames is not None
+                    and k not in fieldnames
+                    and phrases_case.snake(k) not in fieldnames):
+                errors.append(f'{kind}.{k}: field not exists on type')
+            if kind == 'annotate':
+                annotation_errors = [
+                    f'{kind}.{k}: {alias}: {error}'
+                    for alias, error in _iter_annotation_errors(model, v)]
+                errors.extend(annotation_errors)
+                if not annotation_errors:
+                    value[k] = types.MappingProxyType(dict(v))
+                continue
+            if kind == 'related':
+                lookups = () if v == 'self' else (v,)
+            elif isinstance(v, str):
+                errors.append(f'{kind}.{k}: expect lookup list, got string: {v!r}')
+                continue
+            else:
+                v = lookups = tuple(v)
+            for lookup in lookups if model is not None else ():
+                error = _validate_lookup(model, kind, lookup)
+                if error:
+                    errors.append(
+                        f'{kind}.{k}: {lookup}: {error} on {model._meta.label}')
+            value[k] = v
+        ret[kind] = types.MappingProxyType(value)
+    if errors:
+        raise OptimizationOptionError(
+            f'Invalid optimization option for type {typename}:\n'
+            + '\n'.join(errors))
+    return types.MappingProxyType(ret)  # type: ignore
@@ -0,0 +1,92 @@
+"""Dataloader that only load fields selected by query.  """
+
+import typing
+
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from . import dataloader, queryset
+from .optimization import _get_projection, _is_projection_covered
+
+_NOT_CACHED = object()
+
+
+def _get_cached(loader: DataLoader, key) -> typing.Optional[Promise]:
+    """Get promise cached in loader, None if key is not loaded.  """
+
+    # Prime does nothing for existed key.
+    loader.prime(key, _NOT_CACHED)
+    ret = loader.load(key)
+    if ret.is_fulfilled and ret.get() is _NOT_CACHED:
+        loader.clear(key)
+        return None
+    return ret
+
+
+class OptimizedLoaderMixin:  # pylint: disable=too-few-public-methods
+    """Resolver methods that use optimized dataloader,
+    mixed into `Resolver`.
+    """
+
+    def get_optimized_loader(
+            self,
+            model,
+            path: typing.Optional[typing.List[str]] = None,
+    ) -> DataLoader:
+        """Get dataloader for model that only load fields selected by query,
+        using same optimization as `queryset.optimize`.
+        Loader that load more fields will be reused when exists,
+        objects already loaded by `get_loader` loader are not loaded again.
+
+        Args:
+            model: Django model.
+            path (typing.Optional[typing.List[str]]): Field path. defaults to None.
+                None means current field.
+
+        Returns:
+            DataLoader: Dataloader for given model and field selection.
+        """
+
+        optimization = queryset.get_optimization(self.info, model, path)
+        projection = _get_projection(optimization)
+        cache = self._get_loader_cache()
+        key = (model, projection)
+        if key not in cache:
+            for k, v in cache.items():
+                if (isinstance(k, tuple)
+                        and k[0] is model
+                        and isinstance(k[1], tuple)
+                        and _is_projection_covered(projection, k[1])):
+                    cache[key] = v
+                    break
+            else:
+                loader = dataloader.get_for_model(
+                    model,
+                    optimization=optimization,
+                    instrumentation=self.get_instrumentation(),
+                )
+                if not optimization['annotate']:
+                    loader = DataLoader(
+                        self._get_model_loader_cache_batch_load_fn(model, loader),
+                        get_cache_key=loader.get_cache_key,
+                    )
+                cache[key] = loader
+        return cache[key]
+
+    def _get_model_loader_cache_batch_load_fn(self, model, loader: DataLoader):
+        # Model loader load all fields, and objects primed to it
+        # (e.g. connection nodes) are loaded with query selection.
+        cache = self._get_loader_cache()
+
+        def batch_load_fn(keys):
+            model_loader = cache.get(model)
+            cached = [
+                None if model_loader is None else _get_cached(model_loader, i)
+                for i in keys
+            ]
+            return Promise.all([
+                loader.load(i) if j is None else j
+                for i, j in zip(keys, cached)
+            ])
+
+        return batch_load_fn
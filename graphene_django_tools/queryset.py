@@ -1,12 +1,22 @@
 """Queryset optimization.  """
 
-import logging
+import collections
+import threading
 import typing
 
 import django.db.models as djm
 import graphql
-import graphql.language.ast as ast_
-import phrases_case
+
+from . import model_type, optimization_option
+from .optimization import _normalize_optimization, apply_optimization
+from .optimization_option import (  # pylint:disable=unused-import
+    OPTIMIZATION_OPTIONS, clear_registered_options, get_optimization_option,
+    infer_optimization_option, register_optimization_option)
+from .optimization_option_validation import \
+    OptimizationOptionError  # pylint:disable=unused-import
+from .selection import _clear_document_cache, _get_walker
+from .selection_optimization import (_ABSTRACT_TYPES, _get_ast_and_return_type,
+                                     _get_ast_optimization, _get_inner_type)
 
 if typing.TYPE_CHECKING:
     class OptimizationOption(typing.TypedDict):
@@ -19,154 +29,148 @@ if typing.TYPE_CHECKING:
         select: typing.Dict[typing.Optional[str], typing.List[str]]
         prefetch: typing.Dict[typing.Optional[str], typing.List[str]]
         related: typing.Dict[str, str]
+        annotate: typing.Dict[typing.Optional[str], typing.Dict[str, typing.Any]]
 
     class Optimization(typing.TypedDict):
         """Optimization computation result dict.  """
 
         only: typing.List[str]
         select: typing.List[str]
-        prefetch: typing.List[str]
+        prefetch: typing.List[typing.Union[str, djm.Prefetch]]
+        annotate: typing.Dict[str, typing.Any]
 
 
-LOGGER = logging.getLogger(__name__)
-OPTIMIZATION_OPTIONS: typing.Dict[str, dict] = {}
+PlanCacheInfo = collections.namedtuple(
+    'PlanCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
 
+PLAN_CACHE_MAXSIZE = 1024
+_PLAN_CACHE: typing.MutableMapping[typing.Hashable, 'Optimization'] = collections.OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
+_PLAN_CACHE_STATS = {'hits': 0, 'misses': 0}
 
-def get_optimization_option(typename: str) -> 'OptimizationOption':
-    """Get optimization options from typename.
 
-    Args:
-        typename (str): Graphql typename.
+def _get_plan_key(
+        info: graphql.ResolveInfo,
+        path: typing.Optional[typing.List[str]],
+        model: typing.Type[djm.Model],
+        directive_values: typing.Optional[tuple],
+) -> typing.Optional[typing.Hashable]:
+    loc = info.field_asts[0].loc
+    if directive_values is None or loc is None or loc.source is None:
+        return None
+    return (
+        info.schema,
+        loc.source.body,
+        loc.start,
+        tuple(path or ()),
+        model,
+        getattr(OPTIMIZATION_OPTIONS, 'version', None),
+        optimization_option._REGISTERED_OPTIONS_VERSION,
+        directive_values,
+    )
+
+
+def get_plan_cache_info() -> PlanCacheInfo:
+    """Get optimization plan cache statistics.
 
     Returns:
-        OptimizationOption: Options.
+        PlanCacheInfo: `(hits, misses, maxsize, currsize)` named tuple,
+            same as `functools.lru_cache`.
     """
 
-    ret = OPTIMIZATION_OPTIONS.get(
-        typename,
-        {},
+    return PlanCacheInfo(
+        _PLAN_CACHE_STATS['hits'],
+        _PLAN_CACHE_STATS['misses'],
+        PLAN_CACHE_MAXSIZE,
+        len(_PLAN_CACHE),
     )
-    ret.setdefault('only', {})  # type: ignore
-    ret.setdefault('select', {})  # type: ignore
-    ret.setdefault('prefetch', {})  # type: ignore
-    ret.setdefault('related', {})  # type: ignore
-    return ret  # type: ignore
-
-
-def _get_inner_type(return_type):
-    if not hasattr(return_type, 'of_type'):
-        return return_type
-    return _get_inner_type(return_type.of_type)
-
-
-def _get_model_field(model: djm.Model, lookup: str) -> djm.Field:
-    _model = model
-    field = None
-    for i in lookup.split('__'):
-        field = _model._meta.get_field(i)
-        _model = field.related_model
-    assert field is not None
-    return field
-
-
-def _get_default_only_lookups(
-        fieldname: str, model: djm.Model, related_query_name: str) -> typing.List[str]:
-    field = None
-    for lookup in (
-            _format_related_name(related_query_name, fieldname),
-            _format_related_name(related_query_name,
-                                 phrases_case.snake(fieldname)),
-    ):
-        try:
-            field = _get_model_field(model, lookup)
-        except djm.FieldDoesNotExist:
-            continue
-
-    if field is None or not hasattr(field, 'attname'):
-        return []
-
-    return [field.attname]
-
-
-def _get_selection(ast: ast_.Node, fragments, is_recursive=True) -> typing.Iterator[ast_.Field]:
-    if not is_recursive and isinstance(ast, ast_.Field):
-        yield ast
-        return
-    if isinstance(ast, (ast_.Field, ast_.FragmentDefinition, ast_.InlineFragment)):
-        for i in ast.selection_set and ast.selection_set.selections or []:
-            yield from _get_selection(i, fragments, is_recursive=False)
-    elif isinstance(ast, ast_.FragmentSpread):
-        yield from _get_selection(fragments[ast.name.value], fragments)
-    else:
-        raise ValueError(f'Unknown ast type: {ast}')
 
 
-def _format_related_name(related_query_name, name):
-    if related_query_name is 'self':
-        return name
-    return f'{related_query_name}__{name}'
+def clear_plan_cache() -> None:
+    """Clear optimization plan cache, query document cache and statistics.
 
+    Changes of `OPTIMIZATION_OPTIONS` and registered options invalidate cache automatically.
+    """
 
-def _get_ast_optimization(ast, return_type, fragments, model, related_query_name='self') -> 'Optimization':
+    _clear_document_cache()
+    with _PLAN_CACHE_LOCK:
+        _PLAN_CACHE.clear()
+        _PLAN_CACHE_STATS['hits'] = 0
+        _PLAN_CACHE_STATS['misses'] = 0
 
-    inner_type = _get_inner_type(return_type)
 
-    opt = get_optimization_option(inner_type.name)
-    ret: Optimization = {
-        'only': opt['only'].get(None, []),
-        'select': opt['select'].get(None, []),
-        'prefetch': opt['prefetch'].get(None, []),
-    }
+def get_optimization(
+        info: graphql.ResolveInfo,
+        model: typing.Type[djm.Model],
+        path: typing.Optional[typing.List[str]] = None,
+) -> 'Optimization':
+    """Get optimization for model from resolve info, result is cached by query document.
 
-    for sub_ast in _get_selection(ast, fragments):
-        fieldname = sub_ast.name.value
-        ret['only'].extend(opt['only'].get(
-            fieldname) or _get_default_only_lookups(fieldname, model, related_query_name))
-        ret['select'].extend(opt['select'].get(fieldname, []))
-        ret['prefetch'].extend(opt['prefetch'].get(fieldname, []))
-
-        _related_query_name = opt['related'].get(fieldname)
-        if not _related_query_name:
-            continue
-        _optimization = _get_ast_optimization(
-            sub_ast,
-            inner_type.fields[fieldname].type,
-            fragments, model,
-            _related_query_name
-        )
-        ret['only'].extend(_optimization['only'])
-        ret['select'].extend(_optimization['select'])
-        ret['prefetch'].extend(_optimization['prefetch'])
-
-    ret['only'] = [_format_related_name(
-        related_query_name, i) for i in ret['only']]
-    ret['select'] = [_format_related_name(
-        related_query_name, i) for i in ret['select']]
-    ret['prefetch'] = [_format_related_name(
-        related_query_name, i) for i in ret['prefetch']]
-    return ret
+    Args:
+        info (graphql.ResolveInfo): Resolve info.
+        model (typing.Type[djm.Model]): Model to optimize.
+        path (typing.Optional[typing.List[str]]): Field path. defaults to None.
+            None means root field.
 
+    Returns:
+        Optimization: Optimization result, should not be modified.
+    """
 
-def _get_ast_and_return_type(
-        info: graphql.execution.ResolveInfo,
-        path: typing.Optional[typing.List[str]]
-) -> typing.Tuple[graphql.GraphQLField, typing.Union[
-    graphql.GraphQLList,
-    graphql.GraphQLObjectType,
-    graphql.GraphQLScalarType
-]]:
-    ret = (info.field_asts[0], info.return_type)
-    for fieldname in path or []:
-        ret = (
-            next(
-                i.name.value for i in _get_selection(ret[0], info.fragments)
-                if i.name.value == fieldname
-            ),
-            ret[1].fields[fieldname]
-        )
+    walker, directive_values = _get_walker(info, PLAN_CACHE_MAXSIZE)
+    key = _get_plan_key(info, path, model, directive_values)
+    if key is not None:
+        with _PLAN_CACHE_LOCK:
+            ret = _PLAN_CACHE.get(key)
+            if ret is not None:
+                _PLAN_CACHE.move_to_end(key)  # type: ignore
+                _PLAN_CACHE_STATS['hits'] += 1
+                return ret
+            _PLAN_CACHE_STATS['misses'] += 1
+
+    nodes, return_type = _get_ast_and_return_type(info, path, walker)
+    ret = _normalize_optimization(
+        _get_ast_optimization(nodes, return_type, walker, model), model)
+
+    if key is not None:
+        with _PLAN_CACHE_LOCK:
+            _PLAN_CACHE[key] = ret
+            while len(_PLAN_CACHE) > PLAN_CACHE_MAXSIZE:
+                _PLAN_CACHE.popitem(last=False)  # type: ignore
     return ret
 
 
+def get_optimizations(
+        info: graphql.ResolveInfo,
+        path: typing.Optional[typing.List[str]] = None,
+) -> typing.Dict[typing.Type[djm.Model], 'Optimization']:
+    """Get optimization for each model of possible return types,
+    for interface or union, each concrete type has its own optimization.
+    Model is found by `model_type` registry.
+
+    Args:
+        info (graphql.ResolveInfo): Resolve info.
+        path (typing.Optional[typing.List[str]]): Field path. defaults to None.
+            None means root field.
+
+    Returns:
+        typing.Dict[typing.Type[djm.Model], Optimization]: Optimization by model,
+            should not be modified.
+    """
+
+    walker, _ = _get_walker(info, PLAN_CACHE_MAXSIZE)
+    _, return_type = _get_ast_and_return_type(info, path, walker)
+    inner_type = _get_inner_type(return_type)
+    if isinstance(inner_type, _ABSTRACT_TYPES):
+        possible_types = info.schema.get_possible_types(inner_type)
+    else:
+        possible_types = [inner_type]
+    return {
+        model: get_optimization(info, model, path)
+        for i in possible_types
+        for model in model_type.get_models(i.name)
+    }
+
+
 def optimize(
         queryset: djm.QuerySet,
         info: graphql.ResolveInfo,
@@ -184,15 +188,5 @@ def optimize(
         djm.QuerySet: optimized queryset.
     """
 
-    ast, return_type = _get_ast_and_return_type(info, path)
-    optimization = _get_ast_optimization(
-        ast, return_type, info.fragments, queryset.model)
-    LOGGER.debug("Optimization queryset: optimization=%s, model=%s",
-                 optimization, queryset.model)
-    qs = queryset
-    if optimization['select']:
-        qs = qs.select_related(*optimization['select'])
-    if optimization['prefetch']:
-        qs = qs.prefetch_related(*optimization['prefetch'])
-    qs = qs.only(*optimization['only'], *optimization['select'])
-    return qs
+    optimization = get_optimization(info, queryset.model, path)
+    return apply_optimization(queryset, optimization)
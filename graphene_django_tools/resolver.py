@@ -3,63 +3,238 @@
 import typing
 
 import graphene_resolver
+from promise import Promise
 
-from . import dataloader, model_type
-from .global_id import GlobalID
+from . import dataloader, global_id, instrumentation, model_type
+from .async_resolver import AsyncResolverMixin
+from .global_id import GlobalID, InvalidGlobalIDError
+from .optimized_loader import OptimizedLoaderMixin
+from .resolver_option import _register_resolver_option
 
 if typing.TYPE_CHECKING:
-    from promise import Promise
     from promise.dataloader import DataLoader
 
 
-class Resolver(graphene_resolver.Resolver, abstract=True):
+class Resolver(
+        AsyncResolverMixin,
+        OptimizedLoaderMixin,
+        graphene_resolver.Resolver,
+        abstract=True,
+):
     """Enhanced graphene-resolver resolver.  
 
     schema: schema definition
     model: django model
+    only, select, prefetch, related, annotate: optimization option for the type,
+        validated against model when class is created.
+        See :doc:`/optimize` for more information.
     """
 
     _data_loader_cache_attname = '_django_model_loader_cache'
+    _global_id_cache_attname = '_django_global_id_cache'
     model: typing.Optional[typing.Type] = None
+    only: typing.Optional[typing.Dict[typing.Optional[str], typing.List[str]]] = None
+    select: typing.Optional[typing.Dict[typing.Optional[str], typing.List[str]]] = None
+    prefetch: typing.Optional[typing.Dict[typing.Optional[str], typing.List[str]]] = None
+    related: typing.Optional[typing.Dict[str, str]] = None
+    annotate: typing.Optional[
+        typing.Dict[typing.Optional[str], typing.Dict[str, typing.Any]]] = None
 
     def __init_subclass__(cls, **kwargs):
         # pylint: disable=arguments-differ
         super().__init_subclass__(**kwargs)
+        if kwargs.get('abstract'):
+            return
         if cls.model:
             model_type.REGISTRY[cls.model] = cls._schema.name
+        _register_resolver_option(cls)
 
-    def get_loader(self, model) -> 'DataLoader':
-        """Get dataloader for model.
-        for same request, will always returns same dataloader object.
+    def get_context_cache(self, attname: str) -> dict:
+        """Get dict attached to execution context,
+        for same request, will always returns same dict.
+
+        Args:
+            attname (str): Attribute name on context.
 
         Returns:
-            DataLoader: Dataloader for given model
+            dict: Request scoped cache.
         """
 
         ctx = self.context
-        attname = self._data_loader_cache_attname
         if not hasattr(ctx, attname):
             setattr(ctx, attname, {})
-        cache = getattr(ctx, attname)
-        if model not in cache:
-            cache[model] = dataloader.get_for_model(model)
-        return cache[model]
+        return getattr(ctx, attname)
+
+    def _get_loader_cache(self) -> dict:
+        return self.get_context_cache(self._data_loader_cache_attname)
+
+    def get_instrumentation(self) -> typing.Optional['instrumentation.Instrumentation']:
+        """Get instrumentation attached to current execution context.
+
+        Returns:
+            typing.Optional[Instrumentation]: Instrumentation, None if not enabled.
+        """
+
+        return instrumentation.get_for_context(self.context)
+
+    def get_loader(self, model, field_name: str = None) -> 'DataLoader':
+        """Get dataloader for model.
+        for same request, will always returns same dataloader object.
+
+        Args:
+            model: Django model.
+            field_name (str, optional): Many valued relation field name or related query name,
+                when specified, returns loader that load primary key to related objects.
+                Defaults to None.
+
+        Returns:
+            DataLoader: Dataloader for given model
+        """
 
-    def resolve_gid(self, v) -> 'Promise':
+        cache = self._get_loader_cache()
+        key = model if field_name is None else (model, field_name)
+        if key not in cache:
+            if field_name is None:
+                cache[key] = dataloader.get_for_model(
+                    model, instrumentation=self.get_instrumentation())
+            else:
+                cache[key] = dataloader.get_for_relation(
+                    model,
+                    field_name,
+                    get_model_loader=self.get_loader,
+                    instrumentation=self.get_instrumentation(),
+                )
+        return cache[key]
+
+    def _get_gid_loader(self, model, optimize: bool) -> 'DataLoader':
+        if optimize:
+            return self.get_optimized_loader(model)
+        return self.get_loader(model)
+
+    def resolve_gid(self, v, *, optimize: bool = False) -> 'Promise':
         """Resolve global id to a model object promise,
         using dataloader.
 
+        Args:
+            v: Value that can cast to `GlobalID`.
+            optimize (bool, optional): Only load fields selected by query.
+                Defaults to False.
+
         Returns:
             Promise: resolve to model object.
         """
 
         gid = GlobalID.cast(v)
         model = model_type.get_model(gid.type)
-        loader = self.get_loader(model)
+        loader = self._get_gid_loader(model, optimize)
         if isinstance(v, model):
             loader.prime(gid.value, v)
         return loader.load(gid.value)
 
+    def resolve_gids(
+            self,
+            values: typing.Iterable,
+            *,
+            validate_type: typing.Union[str, typing.Tuple[str, ...]] = None,
+            optimize: bool = False,
+    ) -> 'Promise':
+        """Resolve multiple global id to model objects promise,
+        ids are grouped by type, and loaded with one batch per model.
+
+        Args:
+            values (typing.Iterable): Values that can cast to `GlobalID`.
+            validate_type (optional): same as `GlobalID.validate_type` args 1. Defaults to None.
+            optimize (bool, optional): Only load fields selected by query.
+                Defaults to False.
+
+        Raises:
+            InvalidGlobalIDError: Contains all invalid value.
+
+        Returns:
+            Promise: resolve to model object list in input order.
+        """
+
+        values = list(values)
+        try:
+            decoded = iter(global_id.decode_many(i for i in values if isinstance(i, str)))
+        except (TypeError, ValueError):
+            # Cast one by one to report all invalid values.
+            decoded = None
+        groups: typing.Dict[typing.Any, typing.Tuple[typing.List[str], typing.List[int]]] = {}
+        errors = []
+        for index, v in enumerate(values):
+            try:
+                if isinstance(v, str) and decoded is not None:
+                    gid = GlobalID(*next(decoded))
+                else:
+                    gid = GlobalID.cast(v)
+                if validate_type is not None:
+                    gid.validate_type(validate_type)
+                model = model_type.get_model(gid.type)
+            except ValueError as ex:
+                errors.append(f'{index}: {ex}')
+                continue
+            if model not in groups:
+                groups[model] = ([], [])
+            keys, indexes = groups[model]
+            if isinstance(v, model):
+                self._get_gid_loader(model, optimize).prime(gid.value, v)
+            keys.append(gid.value)
+            indexes.append(index)
+        if errors:
+            raise InvalidGlobalIDError(
+                'Invalid ids:\n' + '\n'.join(errors))
+
+        def _merge(results):
+            ret = [None] * len(values)
+            for (_, indexes), objects in zip(groups.values(), results):
+                for index, obj in zip(indexes, objects):
+                    ret[index] = obj
+            return ret
+
+        return Promise.all([
+            self._get_gid_loader(model, optimize).load_many(keys)
+            for model, (keys, _) in groups.items()
+        ]).then(_merge)
+
+    def encode_gid(self, obj) -> str:
+        """Encode global id for model object.
+        for same request, result is cached by model and primary key.
+
+        Args:
+            obj (djm.Model): Model object.
+
+        Returns:
+            str: Encoded global id.
+        """
+
+        cache = self.get_context_cache(self._global_id_cache_attname)
+        key = (obj._meta.model, obj.pk)
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        ret = cache[key] = str(GlobalID.from_object(obj))
+        return ret
+
+    def encode_gids(self, objs: typing.Iterable) -> typing.List[str]:
+        """Encode global ids for model objects,
+        objects not in cache of `encode_gid` are encoded in one batch.
+
+        Args:
+            objs (typing.Iterable): Model objects.
+
+        Returns:
+            typing.List[str]: Encoded global ids in input order.
+        """
+
+        cache = self.get_context_cache(self._global_id_cache_attname)
+        keys = [(i._meta.model, i.pk) for i in objs]
+        missing = [i for i in dict.fromkeys(keys) if i not in cache]
+        cache.update(zip(missing, global_id.encode_many(
+            (model_type.get_typename(model), pk) for model, pk in missing)))
+        return [cache[i] for i in keys]
+
     def get_node(self, id_):
         if not self.model:
             return super().get_node(id_)
@@ -0,0 +1,60 @@
+"""Optimization option declared on resolver class.  """
+
+import typing
+
+import graphene
+import graphene_resolver
+import graphene_resolver.connection
+from graphene.utils.str_converters import to_camel_case
+
+from .optimization_option import (infer_optimization_option,
+                                  register_optimization_option)
+from .optimization_option_validation import OPTION_KINDS
+
+
+def _is_scalar_type(type_) -> bool:
+    while isinstance(type_, graphene.types.structures.Structure):
+        type_ = type_._of_type  # pylint:disable=protected-access
+    if not isinstance(type_, type) and callable(type_):
+        # Named type is lazy when defined by typename string.
+        try:
+            type_ = type_()
+        except KeyError:
+            # Forward reference to type not defined yet.
+            return False
+    return isinstance(type_, type) and issubclass(type_, (graphene.Scalar, graphene.Enum))
+
+
+def _is_connection(definition) -> bool:
+    # Connection is paginated by its resolver, prefetch all rows is wasteful.
+    return (isinstance(definition, type)
+            and issubclass(definition, graphene_resolver.Resolver)
+            and definition._schema.name in graphene_resolver.connection.REGISTRY)
+
+
+def _register_resolver_option(cls) -> None:
+    """Register option inferred from model and declared by class attributes.  """
+
+    child_definition = cls._schema.child_definition
+    fieldnames = (list(child_definition)
+                  if isinstance(child_definition, typing.Mapping) else None)
+    option: dict = {}
+    if cls.model and fieldnames:
+        fields = cls.as_type()._meta.fields
+        option = infer_optimization_option(cls.model, [
+            to_camel_case(i) for i in fieldnames
+            # Use unresolved type, so forward reference not raise here.
+            if not _is_scalar_type(fields[i]._type)
+            and not _is_connection(child_definition[i])
+        ])
+    for i in OPTION_KINDS:
+        value = getattr(cls, i)
+        if value is not None:
+            option[i] = {**option.get(i, {}), **value}
+    if any(option.values()):
+        register_optimization_option(
+            cls._schema.name,
+            option,
+            model=cls.model,
+            fieldnames=fieldnames,
+        )
@@ -0,0 +1,203 @@
+"""Query selection set walker.  """
+
+import collections
+import threading
+import typing
+
+import graphql
+import graphql.language.ast as ast_
+
+_FieldMap = typing.Dict[str, typing.List[ast_.Field]]
+
+
+def _get_directive_value(value: ast_.Value, variables: typing.Mapping[str, typing.Any]) -> bool:
+    if isinstance(value, ast_.Variable):
+        return bool(variables.get(value.name.value))
+    return bool(getattr(value, 'value', False))
+
+
+def _should_include(node: ast_.Node, variables: typing.Mapping[str, typing.Any]) -> bool:
+    for directive in getattr(node, 'directives', None) or ():
+        name = directive.name.value
+        if name not in ('skip', 'include'):
+            continue
+        value = next(
+            (_get_directive_value(i.value, variables)
+             for i in directive.arguments or () if i.name.value == 'if'),
+            False,
+        )
+        if (name == 'skip') == value:
+            return False
+    return True
+
+
+def _iter_directive_variables(node: ast_.Node) -> typing.Iterator[str]:
+    for directive in getattr(node, 'directives', None) or ():
+        if directive.name.value not in ('skip', 'include'):
+            continue
+        for i in directive.arguments or ():
+            if isinstance(i.value, ast_.Variable):
+                yield i.value.name.value
+    selection_set = getattr(node, 'selection_set', None)
+    for i in selection_set and selection_set.selections or ():
+        yield from _iter_directive_variables(i)
+
+
+class _SelectionWalker:
+    """Collect fields from selection set, merged by response key.
+
+    Fragment expansion and selection collection are memoized,
+    so a walker should only be used for same document and directive variables.
+
+    Fields are collected for a object typename, fragments that type condition
+    not match it are ignored. Typename None means all fragments are used.
+    """
+
+    def __init__(
+            self,
+            schema: graphql.GraphQLSchema,
+            fragments: typing.Mapping[str, ast_.FragmentDefinition],
+            variables: typing.Mapping[str, typing.Any],
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self._fragment_fields: typing.Dict[
+            typing.Tuple[str, typing.Optional[str]], _FieldMap] = {}
+        self._fields: typing.Dict[typing.Hashable, typing.Tuple[ast_.Node, _FieldMap]] = {}
+
+    def _does_type_apply(
+            self,
+            condition: typing.Optional[ast_.NamedType],
+            typename: typing.Optional[str],
+    ) -> bool:
+        if condition is None or typename is None or condition.name.value == typename:
+            return True
+        type_ = self.schema.get_type(condition.name.value)
+        if not isinstance(type_, (graphql.GraphQLInterfaceType, graphql.GraphQLUnionType)):
+            return False
+        return self.schema.is_possible_type(type_, self.schema.get_type(typename))
+
+    def _collect(
+            self,
+            selection_set: typing.Optional[ast_.SelectionSet],
+            typename: typing.Optional[str],
+            out: _FieldMap,
+    ) -> None:
+        for i in selection_set and selection_set.selections or ():
+            if not _should_include(i, self.variables):
+                continue
+            if isinstance(i, ast_.Field):
+                key = (i.alias or i.name).value
+                out.setdefault(key, []).append(i)
+            elif isinstance(i, ast_.InlineFragment):
+                if self._does_type_apply(i.type_condition, typename):
+                    self._collect(i.selection_set, typename, out)
+            elif isinstance(i, ast_.FragmentSpread):
+                for k, v in self.get_fragment_fields(i.name.value, typename).items():
+                    out.setdefault(k, []).extend(v)
+            else:
+                raise ValueError(f'Unknown ast type: {i}')
+
+    def get_fragment_fields(self, name: str, typename: typing.Optional[str] = None) -> _FieldMap:
+        """Get fields of named fragment, fragment is expanded only once.  """
+
+        key = (name, typename)
+        ret = self._fragment_fields.get(key)
+        if ret is None:
+            ret = {}
+            fragment = self.fragments[name]
+            if self._does_type_apply(fragment.type_condition, typename):
+                self._collect(fragment.selection_set, typename, ret)
+            self._fragment_fields[key] = ret
+        return ret
+
+    def get_fields(self, node: ast_.Node, typename: typing.Optional[str] = None) -> _FieldMap:
+        """Get fields selected by node.  """
+
+        # Same document parsed again has same node position.
+        key = ('loc', node.loc.start, typename) if node.loc else ('id', id(node), typename)
+        cached = self._fields.get(key)
+        if cached is not None and (node.loc or cached[0] is node):
+            return cached[1]
+        ret: _FieldMap = {}
+        self._collect(node.selection_set, typename, ret)
+        self._fields[key] = (node, ret)
+        return ret
+
+    def get_subfields(
+            self,
+            nodes: typing.Sequence[ast_.Field],
+            typename: typing.Optional[str] = None,
+    ) -> _FieldMap:
+        """Get merged sub fields of fields that share same response key.  """
+
+        if len(nodes) == 1:
+            return self.get_fields(nodes[0], typename)
+        ret: _FieldMap = {}
+        for node in nodes:
+            for k, v in self.get_fields(node, typename).items():
+                ret.setdefault(k, []).extend(v)
+        return ret
+
+
+class _DocumentCache(typing.NamedTuple):
+    """Directive variables and walkers of a query document operation.  """
+
+    directive_variables: typing.Tuple[str, ...]
+    walkers: typing.Dict[typing.Tuple[bool, ...], _SelectionWalker]
+
+
+_DOCUMENT_CACHE: typing.MutableMapping[typing.Hashable,
+                                       _DocumentCache] = collections.OrderedDict()
+_DOCUMENT_CACHE_LOCK = threading.Lock()
+
+
+def _get_walker(
+        info: graphql.ResolveInfo,
+        maxsize: int,
+) -> typing.Tuple[_SelectionWalker, typing.Optional[tuple]]:
+    """Get selection walker for resolve info.
+
+    Args:
+        info (graphql.ResolveInfo): Resolve info.
+        maxsize (int): Max count of cached query document operation.
+
+    Returns:
+        typing.Tuple[_SelectionWalker, typing.Optional[tuple]]:
+            Walker and directive variable values, value is None when document is not cacheable.
+    """
+
+    variables = info.variable_values or {}
+    loc = info.operation.loc
+    if loc is None or loc.source is None:
+        return _SelectionWalker(info.schema, info.fragments, variables), None
+    # Each operation of document use different directive variables.
+    key = (info.schema, loc.source.body, loc.start)
+    with _DOCUMENT_CACHE_LOCK:
+        document = _DOCUMENT_CACHE.get(key)
+        if document is not None:
+            _DOCUMENT_CACHE.move_to_end(key)  # type: ignore
+    if document is None:
+        document = _DocumentCache(tuple(sorted({
+            j
+            for i in (info.operation, *info.fragments.values())
+            for j in _iter_directive_variables(i)
+        })), {})
+        with _DOCUMENT_CACHE_LOCK:
+            _DOCUMENT_CACHE[key] = document
+            while len(_DOCUMENT_CACHE) > maxsize:
+                _DOCUMENT_CACHE.popitem(last=False)  # type: ignore
+    values = tuple(bool(variables.get(i)) for i in document.directive_variables)
+    walker = document.walkers.get(values)
+    if walker is None:
+        # Walker is shared by requests, so only keep values it depends on.
+        walker = _SelectionWalker(
+            info.schema, info.fragments, dict(zip(document.directive_variables, values)))
+        document.walkers[values] = walker
+    return walker, values
+
+
+def _clear_document_cache() -> None:
+    with _DOCUMENT_CACHE_LOCK:
+        _DOCUMENT_CACHE.clear()
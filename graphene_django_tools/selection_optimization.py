@@ -0,0 +1,216 @@
+"""Optimization computation from query selection.  """
+
+import logging
+import typing
+
+import django.db.models as djm
+import graphql
+import graphql.language.ast as ast_
+
+from . import model_type
+from .model_field import (_format_related_name, _get_default_only_lookups,
+                          _get_model_field, _get_prefetch_join_lookups,
+                          _get_related_model)
+from .optimization import (_merge_prefetch, _normalize_optimization,
+                           _OptimizedPrefetch)
+from .optimization_option import get_optimization_option
+from .selection import _SelectionWalker
+
+if typing.TYPE_CHECKING:
+    from .queryset import Optimization, OptimizationOption
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _get_inner_type(return_type):
+    if not hasattr(return_type, 'of_type'):
+        return return_type
+    return _get_inner_type(return_type.of_type)
+
+
+_ABSTRACT_TYPES = (graphql.GraphQLInterfaceType, graphql.GraphQLUnionType)
+
+
+def _get_concrete_type(schema: graphql.GraphQLSchema, type_, model):
+    """Get object type registered for model when type is abstract,
+    returns type unchanged when can not determinate.
+    """
+
+    if not isinstance(type_, _ABSTRACT_TYPES) or model is None:
+        return type_
+    typename = model_type.REGISTRY.get_typename(model)
+    concrete_type = typename and schema.get_type(typename)
+    if not concrete_type or not schema.is_possible_type(type_, concrete_type):
+        return type_
+    return concrete_type
+
+
+def _get_field_type(schema: graphql.GraphQLSchema, type_, fieldname: str):
+    fields = getattr(type_, 'fields', None) or {}
+    if fieldname in fields:
+        return fields[fieldname].type
+    if isinstance(type_, _ABSTRACT_TYPES):
+        for i in schema.get_possible_types(type_):
+            if fieldname in i.fields:
+                return i.fields[fieldname].type
+    raise KeyError(f'Field not found: type={type_}, field={fieldname}')
+
+
+class _Scope(typing.NamedTuple):
+    """Position of a selection level in optimized queryset.  """
+
+    walker: _SelectionWalker
+    # Model of optimized queryset.
+    model: typing.Type[djm.Model]
+    # Lookup from parent level, results of this level are prefixed with it.
+    related_query_name: str
+    # Model for current level, used to determinate concrete type of interface and union.
+    current_model: typing.Type[djm.Model]
+
+
+def _get_prefetch(
+        nodes: typing.Sequence[ast_.Field],
+        return_type,
+        walker: _SelectionWalker,
+        model: typing.Optional[typing.Type[djm.Model]],
+        lookup: str,
+) -> typing.Optional[_OptimizedPrefetch]:
+    """Get prefetch with optimized queryset for a single relation lookup,
+    returns None when not possible.
+    """
+
+    if model is None or '__' in lookup:
+        return None
+    field = _get_model_field(model, lookup)
+    if field is None or not field.is_relation or field.related_model is None:
+        return None
+    related_model = field.related_model
+    optimization = _get_ast_optimization(
+        nodes, return_type, walker, related_model)
+    optimization['only'].extend(_get_prefetch_join_lookups(field))
+    return _OptimizedPrefetch(
+        lookup, related_model, _normalize_optimization(optimization, related_model))
+
+
+def _get_field_optimization(
+        nodes: typing.Sequence[ast_.Field],
+        fieldname: str,
+        field_type,
+        opt: 'OptimizationOption',
+        scope: _Scope,
+) -> 'Optimization':
+    """Get optimization for one field of a selection level,
+    field type is None when field not defined on type.
+    """
+
+    ret: Optimization = {
+        'only': list(opt['only'].get(fieldname) or _get_default_only_lookups(
+            fieldname, scope.model, scope.related_query_name)),
+        'select': list(opt['select'].get(fieldname, [])),
+        'prefetch': list(opt['prefetch'].get(fieldname, [])),
+        'annotate': dict(opt['annotate'].get(fieldname, {})),
+    }
+    related_query_name = opt['related'].get(fieldname)
+    if not related_query_name or field_type is None:
+        return ret
+    if related_query_name in ret['prefetch']:
+        # Optimize prefetched queryset with sub selection.
+        prefetch = _get_prefetch(
+            nodes, field_type, scope.walker, scope.current_model, related_query_name)
+        if prefetch is not None:
+            ret['prefetch'] = [
+                prefetch if i == related_query_name else i for i in ret['prefetch']]
+            return ret
+    _merge_optimization(ret, _get_scope_optimization(nodes, field_type, scope._replace(
+        related_query_name=related_query_name,
+        current_model=(_get_related_model(scope.current_model, related_query_name)
+                       or scope.model),
+    )))
+    return ret
+
+
+def _merge_optimization(optimization: 'Optimization', other: 'Optimization') -> None:
+    optimization['only'].extend(other['only'])
+    optimization['select'].extend(other['select'])
+    optimization['prefetch'].extend(other['prefetch'])
+    optimization['annotate'].update(other['annotate'])
+
+
+def _get_scope_optimization(
+        nodes: typing.Sequence[ast_.Field],
+        return_type,
+        scope: _Scope,
+) -> 'Optimization':
+    inner_type = _get_concrete_type(
+        scope.walker.schema, _get_inner_type(return_type), scope.current_model)
+    typename = None if isinstance(inner_type, _ABSTRACT_TYPES) else inner_type.name
+    type_fields = getattr(inner_type, 'fields', None) or {}
+
+    opt = get_optimization_option(inner_type.name)
+    ret: Optimization = {
+        'only': list(opt['only'].get(None, [])),
+        'select': list(opt['select'].get(None, [])),
+        'prefetch': list(opt['prefetch'].get(None, [])),
+        'annotate': dict(opt['annotate'].get(None, {})),
+    }
+
+    # Group by field name, so aliased fields are optimized together.
+    fields: typing.Dict[str, typing.List[ast_.Field]] = {}
+    for sub_nodes in scope.walker.get_subfields(nodes, typename).values():
+        fields.setdefault(sub_nodes[0].name.value, []).extend(sub_nodes)
+    for fieldname, sub_nodes in fields.items():
+        field = type_fields.get(fieldname)
+        _merge_optimization(ret, _get_field_optimization(
+            sub_nodes, fieldname, field and field.type, opt, scope))
+
+    related_query_name = scope.related_query_name
+    if related_query_name != 'self' and ret['annotate']:
+        # Selected related object can not be annotated.
+        LOGGER.debug(
+            'Ignore annotation on related object, use prefetch instead: '
+            'related_query_name=%s, annotate=%s',
+            related_query_name, ret['annotate'])
+        ret['annotate'] = {}
+    ret['only'] = [_format_related_name(
+        related_query_name, i) for i in ret['only']]
+    ret['select'] = [_format_related_name(
+        related_query_name, i) for i in ret['select']]
+    ret['prefetch'] = _merge_prefetch(
+        i.with_prefix(related_query_name)
+        if isinstance(i, _OptimizedPrefetch) and related_query_name != 'self'
+        else _format_related_name(related_query_name, i)
+        for i in ret['prefetch']
+    )
+    return ret
+
+
+def _get_ast_optimization(
+        nodes: typing.Sequence[ast_.Field],
+        return_type,
+        walker: _SelectionWalker,
+        model: typing.Type[djm.Model],
+) -> 'Optimization':
+    return _get_scope_optimization(
+        nodes, return_type, _Scope(walker, model, 'self', model))
+
+
+def _get_ast_and_return_type(
+        info: graphql.execution.ResolveInfo,
+        path: typing.Optional[typing.List[str]],
+        walker: _SelectionWalker,
+) -> typing.Tuple[typing.List[ast_.Field], typing.Union[
+    graphql.GraphQLList,
+    graphql.GraphQLObjectType,
+    graphql.GraphQLScalarType
+]]:
+    nodes, return_type = list(info.field_asts), info.return_type
+    for fieldname in path or []:
+        nodes = [
+            j
+            for i in walker.get_subfields(nodes).values()
+            for j in i
+            if j.name.value == fieldname
+        ]
+        return_type = _get_field_type(
+            info.schema, _get_inner_type(return_type), fieldname)
+    return nodes, return_type
@@ -0,0 +1,225 @@
+"""Cross request shared cache for model data loader.
+
+Model objects loaded by data loader are cached in a shared backend,
+so hot reference data are not re-fetched by every request.
+"""
+
+import abc
+import collections
+import pickle
+import threading
+import time
+import typing
+
+import django.db.models as djm
+import django.db.models.signals as djs
+
+
+class Backend(abc.ABC):
+    """Shared cache backend interface.  """
+
+    @abc.abstractmethod
+    def get_many(self, keys: typing.List[str]) -> typing.Dict[str, typing.Any]:
+        """Get values for keys, missing keys are not included.  """
+
+    @abc.abstractmethod
+    def set_many(self, mapping: typing.Dict[str, typing.Any], ttl: typing.Optional[float]):
+        """Set values.  """
+
+    @abc.abstractmethod
+    def delete_many(self, keys: typing.List[str]):
+        """Delete keys.  """
+
+
+class MemoryBackend(Backend):
+    """In-process LRU backend with TTL.
+
+    Values are pickled, so cached objects are not shared between requests.
+
+    Args:
+        maxsize (int, optional): Max item count. Defaults to 1024.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: typing.MutableMapping[str, typing.Tuple[typing.Optional[float], bytes]] = \
+            collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: typing.List[str]) -> typing.Dict[str, typing.Any]:
+        """Get values for keys, missing or expired keys are not included.  """
+
+        now = time.monotonic()
+        ret = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is None:
+                    continue
+                expires_at, data = item
+                if expires_at is not None and expires_at <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)  # type: ignore
+                ret[key] = data
+        return {k: pickle.loads(v) for k, v in ret.items()}
+
+    def set_many(self, mapping: typing.Dict[str, typing.Any], ttl: typing.Optional[float]):
+        """Set values, evict least recently used items when exceeds `maxsize`.  """
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        items = [(k, (expires_at, pickle.dumps(v, pickle.HIGHEST_PROTOCOL)))
+                 for k, v in mapping.items()]
+        with self._lock:
+            for k, v in items:
+                self._data[k] = v
+                self._data.move_to_end(k)  # type: ignore
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # type: ignore
+
+    def delete_many(self, keys: typing.List[str]):
+        """Delete keys.  """
+
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend(Backend):
+    """Backend use django cache framework, e.g. redis, memcached,
+    or `LocMemCache` as local stand-in.
+
+    Args:
+        alias (str, optional): Django cache alias. Defaults to 'default'.
+    """
+
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        """Django cache object.  """
+
+        # pylint: disable=import-outside-toplevel
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get_many(self, keys: typing.List[str]) -> typing.Dict[str, typing.Any]:
+        """Get values for keys, missing keys are not included.  """
+
+        return self.cache.get_many(keys)
+
+    def set_many(self, mapping: typing.Dict[str, typing.Any], ttl: typing.Optional[float]):
+        """Set values.  """
+
+        self.cache.set_many(mapping, timeout=ttl)
+
+    def delete_many(self, keys: typing.List[str]):
+        """Delete keys.  """
+
+        self.cache.delete_many(keys)
+
+
+class SharedCache:
+    """Shared cache for one model.
+
+    Args:
+        model: Django model.
+        backend (Backend): Cache backend.
+        ttl (typing.Optional[float]): Seconds before cached value expire,
+            None means never expire.
+    """
+
+    def __init__(self, model, backend: Backend, ttl: typing.Optional[float]):
+        self.model = model
+        self.backend = backend
+        self.ttl = ttl
+        self.key_prefix = f'graphene_django_tools:{model._meta.label_lower}:'
+
+    def get_key(self, pk) -> str:
+        """Get backend key for primary key.  """
+
+        return f'{self.key_prefix}{pk}'
+
+    def get_many(self, pks: typing.List) -> typing.Dict[typing.Any, djm.Model]:
+        """Get cached objects, missing objects are not included.
+
+        Returns:
+            typing.Dict[typing.Any, djm.Model]: Primary key to object map.
+        """
+
+        keys = {self.get_key(i): i for i in pks}
+        return {keys[k]: v for k, v in self.backend.get_many(list(keys)).items()}
+
+    def set_many(self, objects: typing.Iterable[djm.Model]):
+        """Set objects to cache.  """
+
+        mapping = {self.get_key(i.pk): i for i in objects}
+        if mapping:
+            self.backend.set_many(mapping, self.ttl)
+
+    def delete(self, pk):
+        """Delete object from cache.  """
+
+        self.backend.delete_many([self.get_key(pk)])
+
+
+REGISTRY: typing.Dict[typing.Type[djm.Model], SharedCache] = {}
+
+
+def _invalidate(sender, instance, **_):
+    # pylint: disable=unused-argument
+    concrete_model = instance._meta.concrete_model
+    for model, cache in REGISTRY.items():
+        if model._meta.concrete_model is concrete_model:
+            cache.delete(instance.pk)
+
+
+def register(
+        model,
+        backend: Backend = None,
+        *,
+        ttl: typing.Optional[float] = 300,
+) -> SharedCache:
+    """Enable shared cache for model data loader.
+    Cache is invalidated on `post_save` and `post_delete` signal.
+
+    Args:
+        model: Django model.
+        backend (Backend, optional): Cache backend.
+            Defaults to a new `MemoryBackend`.
+        ttl (typing.Optional[float], optional): Seconds before cached value expire.
+            Defaults to 300.
+
+    Returns:
+        SharedCache: Registered shared cache.
+    """
+
+    if backend is None:
+        backend = MemoryBackend()
+    ret = SharedCache(model, backend, ttl)
+    REGISTRY[model] = ret
+    djs.post_save.connect(
+        _invalidate, dispatch_uid='graphene_django_tools.shared_cache')
+    djs.post_delete.connect(
+        _invalidate, dispatch_uid='graphene_django_tools.shared_cache')
+    return ret
+
+
+def unregister(model) -> None:
+    """Disable shared cache for model.  """
+
+    REGISTRY.pop(model, None)
+
+
+def get(model) -> typing.Optional[SharedCache]:
+    """Get shared cache for model.
+
+    Returns:
+        typing.Optional[SharedCache]: Shared cache, None if not registered.
+    """
+
+    return REGISTRY.get(model)
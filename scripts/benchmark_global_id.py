@@ -0,0 +1,46 @@
+"""Compare global id codec with graphene implementation.
+
+Usage: python scripts/benchmark_global_id.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+import graphene  # noqa: E402
+
+from graphene_django_tools import global_id  # noqa: E402
+
+ITEMS = [('Article', str(i)) for i in range(500)]
+ENCODED = [graphene.Node.to_global_id(*i) for i in ITEMS]
+
+CASES = [
+    ('encode (graphene)',
+     lambda: [graphene.Node.to_global_id(*i) for i in ITEMS]),
+    ('encode',
+     lambda: [global_id.encode(*i) for i in ITEMS]),
+    ('encode_many',
+     lambda: global_id.encode_many(ITEMS)),
+    ('decode (graphene)',
+     lambda: [graphene.Node.from_global_id(i) for i in ENCODED]),
+    ('decode',
+     lambda: [global_id.decode(i) for i in ENCODED]),
+    ('decode_many',
+     lambda: global_id.decode_many(ENCODED)),
+]
+
+
+def main():
+    """Run benchmark and print result.  """
+
+    number = 200
+    for name, fn in CASES:
+        best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        print(f'{name:20}{best * 1e6:10.1f} us / {len(ITEMS)} ids')
+
+
+if __name__ == '__main__':
+    main()
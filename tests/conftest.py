@@ -5,3 +5,5 @@ import graphene_django_tools as gdtools
 @pytest.fixture(autouse=True)
 def _clear_registry():
     gdtools.queryset.OPTIMIZATION_OPTIONS.clear()
+    gdtools.queryset.clear_registered_options()
+    gdtools.connection.COUNT_OPTIONS.clear()
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import uuid
+
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
 import django.contrib.contenttypes.fields as ctf
@@ -113,8 +115,23 @@ class Article(models.Model):
         ordering = ("headline",)
 
 
+class Shelter(models.Model):
+    code = models.CharField(max_length=10, unique=True)
+
+
+class Kennel(models.Model):
+    shelter = models.ForeignKey(
+        Shelter, on_delete=models.CASCADE, to_field="code", related_name="kennels"
+    )
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=50)
     content_type = models.ForeignKey(ctm.ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content = ctf.GenericForeignKey('content_type', 'object_id')
+
+
+class Document(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    title = models.CharField(max_length=50)
@@ -0,0 +1,134 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import asyncio
+import types
+
+import django.http as http
+import pytest
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+# Queries run in executor thread, data should be committed.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture(autouse=True, name='loop')
+def _loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+    asyncio.set_event_loop(None)
+
+
+def test_batch():
+    calls = []
+
+    async def batch_load_fn(keys):
+        calls.append(keys)
+        return [i * 2 for i in keys]
+
+    loader = gdtools.async_dataloader.AsyncDataLoader(batch_load_fn)
+
+    async def _main():
+        ret = await asyncio.gather(
+            loader.load(1),
+            loader.load(2),
+            loader.load_many([2, 3]),
+        )
+        ret2 = await loader.load(3)
+        return ret, ret2
+    assert _run(_main()) == ([2, 4, [4, 6]], 6)
+    assert calls == [[1, 2, 3]]
+
+
+def test_error():
+
+    async def batch_load_fn(keys):
+        return [ValueError(i) if i == 1 else i for i in keys]
+
+    loader = gdtools.async_dataloader.AsyncDataLoader(batch_load_fn)
+
+    async def _main():
+        assert await loader.load(2) == 2
+        with pytest.raises(ValueError):
+            await loader.load(1)
+    _run(_main())
+
+
+def test_model():
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    loader = gdtools.async_dataloader.get_for_model(models.Reporter)
+
+    async def _main():
+        return await asyncio.gather(
+            loader.load(reporter1.pk),
+            loader.load(str(reporter2.pk)),
+            loader.load(str(reporter1.pk)),
+        )
+    assert _run(_main()) == [reporter1, reporter2, reporter1]
+
+
+def test_resolver():
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {'first_name': 'String!'},
+        }
+        model = models.Reporter
+
+    resolver = Reporter(info=types.SimpleNamespace(context=http.HttpRequest()))
+
+    async def _main():
+        return await asyncio.gather(
+            resolver.aresolve_gid(gdtools.GlobalID.from_object(reporter1)),
+            resolver.aget_node(reporter2.pk),
+        )
+    assert _run(_main()) == [reporter1, reporter2]
+    assert resolver.get_async_loader(
+        models.Reporter) is resolver.get_async_loader(models.Reporter)
+
+
+def test_model_max_batch_size():
+    pets = [models.Pet.objects.create(name=f'pet{i}', age=i) for i in range(5)]
+    loader = gdtools.async_dataloader.get_for_model(
+        models.Pet, max_batch_size=2)
+
+    async def _main():
+        return await loader.load_many([i.pk for i in reversed(pets)])
+    assert _run(_main()) == pets[::-1]
+
+
+def test_close_old_connections(monkeypatch):
+    pet = models.Pet.objects.create(name='pet', age=1)
+    calls = []
+    close_old_connections = gdtools.dataloader.djdb.close_old_connections
+
+    def _close_old_connections():
+        calls.append(1)
+        close_old_connections()
+
+    monkeypatch.setattr(gdtools.dataloader.djdb, 'close_old_connections', _close_old_connections)
+    loader = gdtools.async_dataloader.get_for_model(models.Pet)
+
+    async def _main():
+        return await loader.load(pet.pk)
+    assert _run(_main()) == pet
+    assert len(calls) == 2
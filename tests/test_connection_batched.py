@@ -0,0 +1,235 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+from graphql_relay.connection import arrayconnection
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='schema')
+def _schema(request):
+    for i in range(3):
+        reporter = models.Reporter.objects.create(
+            first_name=f'reporter{i}',
+            email=f'reporter{i}@example.com',
+        )
+        for j in range(i + 1):
+            models.Article.objects.create(
+                headline=f'article{j} of reporter{i}',
+                pub_date=timezone.now(),
+                pub_date_time=timezone.now(),
+                reporter=reporter,
+                editor=reporter,
+            )
+
+    # Connection type is cached by name.
+    name = request.node.name.title().replace('_', '')
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!'}
+        model = models.Article
+
+    class ReporterArticles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Article, name=f'{name}ArticleConnection')
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.order_by('-pk')
+            return gdtools.connection.batched_resolve(
+                self.info, qs, 'reporter', self.parent, **kwargs)
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'articles': ReporterArticles,
+        }
+        model = models.Reporter
+        only = {None: ['reporter_type']}
+
+    class Reporters(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Reporter, name=f'{name}ReporterConnection')
+
+        def resolve(self, **kwargs):
+            qs = models.Reporter.objects.order_by('pk')
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+
+    return graphene.Schema(query=Query)
+
+
+def _get_articles(result):
+    assert not result.errors
+    return [i['articles'] for i in result.data['reporters']['nodes']]
+
+
+def test_first(schema, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        result = schema.execute('''\
+    {
+        reporters {
+            nodes {
+                articles(first: 2) {
+                    nodes {
+                        headline
+                    }
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert _get_articles(result) == [
+        {
+            'nodes': [{'headline': 'article0 of reporter0'}],
+            'pageInfo': {'hasNextPage': False, 'endCursor': arrayconnection.offset_to_cursor(0)},
+        },
+        {
+            'nodes': [{'headline': 'article1 of reporter1'}, {'headline': 'article0 of reporter1'}],
+            'pageInfo': {'hasNextPage': False, 'endCursor': arrayconnection.offset_to_cursor(1)},
+        },
+        {
+            'nodes': [{'headline': 'article2 of reporter2'}, {'headline': 'article1 of reporter2'}],
+            'pageInfo': {'hasNextPage': True, 'endCursor': arrayconnection.offset_to_cursor(1)},
+        },
+    ]
+
+
+def test_after_and_total_count(schema, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        result = schema.execute('''\
+    query ($after: String) {
+        reporters {
+            nodes {
+                articles(first: 1, after: $after) {
+                    totalCount
+                    edges {
+                        node {
+                            headline
+                        }
+                        cursor
+                    }
+                }
+            }
+        }
+    }
+    ''', variable_values={'after': arrayconnection.offset_to_cursor(0)},
+            context_value=http.HttpRequest())
+    assert _get_articles(result) == [
+        {'totalCount': 1, 'edges': []},
+        {
+            'totalCount': 2,
+            'edges': [{
+                'node': {'headline': 'article0 of reporter1'},
+                'cursor': arrayconnection.offset_to_cursor(1),
+            }],
+        },
+        {
+            'totalCount': 3,
+            'edges': [{
+                'node': {'headline': 'article1 of reporter2'},
+                'cursor': arrayconnection.offset_to_cursor(1),
+            }],
+        },
+    ]
+
+
+def test_last_fallback(schema, django_assert_num_queries):
+    # Count and page query for each reporter.
+    with django_assert_num_queries(7):
+        result = schema.execute('''\
+    {
+        reporters {
+            nodes {
+                articles(last: 1) {
+                    nodes {
+                        headline
+                    }
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert _get_articles(result) == [
+        {'nodes': [{'headline': 'article0 of reporter0'}]},
+        {'nodes': [{'headline': 'article0 of reporter1'}]},
+        {'nodes': [{'headline': 'article0 of reporter2'}]},
+    ]
+
+
+def test_invalid_parent_field():
+    with pytest.raises(ValueError):
+        gdtools.connection.batched_resolve(
+            None, models.Reporter.objects.all(), 'articles', 1)
+
+
+def test_queryset_depends_on_parent(django_assert_num_queries):
+    for i in range(2):
+        reporter = models.Reporter.objects.create(first_name=f'reporter{i}')
+        for j in range(2):
+            models.Article.objects.create(
+                headline=f'article{j} of reporter{i}',
+                pub_date=timezone.now(),
+                pub_date_time=timezone.now(),
+                reporter=reporter,
+                editor=reporter,
+            )
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!'}
+        model = models.Article
+
+    class ReporterArticles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Article, name='ParentArticleConnection')
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.exclude(
+                headline=f'article0 of {self.parent.first_name}').order_by('pk')
+            return gdtools.connection.batched_resolve(
+                self.info, qs, 'reporter', self.parent, **kwargs)
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'articles': ReporterArticles,
+        }
+        model = models.Reporter
+
+    class Reporters(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            return models.Reporter.objects.order_by('pk')
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+    schema = graphene.Schema(query=Query)
+
+    # Parents that use different queryset are loaded separately.
+    with django_assert_num_queries(3):
+        result = schema.execute('''\
+    {
+        reporters {
+            articles(first: 2) {
+                nodes {
+                    headline
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert [i['articles']['nodes'] for i in result.data['reporters']] == [
+        [{'headline': 'article1 of reporter0'}],
+        [{'headline': 'article1 of reporter1'}],
+    ]
@@ -0,0 +1,123 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import graphene
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='pets')
+def _pets():
+    return [
+        models.Pet.objects.create(name=f'pet{i}', age=i)
+        for i in range(5)
+    ]
+
+
+def test_has_next_page_without_count(pets):
+    qs = models.Pet.objects.order_by('pk')
+    with CaptureQueriesContext(connection) as ctx:
+        result = gdtools.connection.resolve(qs, first=2)
+        assert list(result['nodes']) == pets[:2]
+        assert result['pageInfo']['has_next_page']
+        assert result['pageInfo']['end_cursor'] == result['edges'][-1]['cursor']
+    assert len(ctx.captured_queries) == 1
+    assert 'COUNT' not in ctx.captured_queries[0]['sql']
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = gdtools.connection.resolve(
+            qs, first=2, after=str(result['pageInfo']['end_cursor']))
+        assert list(result['nodes']) == pets[2:4]
+        assert result['pageInfo']['has_next_page']
+        result = gdtools.connection.resolve(
+            qs, first=2, after=str(result['pageInfo']['end_cursor']))
+        assert list(result['nodes']) == pets[4:]
+        assert not result['pageInfo']['has_next_page']
+    assert len(ctx.captured_queries) == 2
+
+
+def test_nodes_evaluated_once(pets, django_assert_num_queries):
+    qs = models.Pet.objects.order_by('pk')
+    result = gdtools.connection.resolve(qs, first=2)
+    with django_assert_num_queries(1):
+        nodes = result['nodes']
+        assert isinstance(nodes, list)
+        assert list(nodes) == pets[:2]
+        assert list(nodes) == pets[:2]
+
+
+def test_count_option(pets):
+    qs = models.Pet.objects.all()
+    assert gdtools.connection.resolve(
+        qs, first=1, count_option={'mode': 'capped', 'cap': 3},
+    )['totalCount'] == 3
+    assert gdtools.connection.resolve(
+        qs, first=1, count_option={'mode': 'capped', 'cap': 10},
+    )['totalCount'] == 5
+    # Fallback to exact count on database that not support estimation.
+    assert gdtools.connection.resolve(
+        qs, first=1, count_option={'mode': 'estimated'},
+    )['totalCount'] == 5
+    with pytest.raises(ValueError, match='Unknown count mode'):
+        gdtools.connection.get_count(qs, {'mode': 'unknown'})
+
+
+def test_count_option_for_connection_type(pets):
+
+    class CountPet(gdtools.Resolver):
+        schema = {'name': 'String!'}
+        model = models.Pet
+
+    class Pets(gdtools.Resolver):
+        schema = gdtools.connection.get_type(CountPet)
+
+        def resolve(self, **kwargs):
+            qs = models.Pet.objects.order_by('pk')
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        pets = Pets.as_field()
+    schema = graphene.Schema(query=Query)
+    gdtools.connection.COUNT_OPTIONS['CountPetConnection'] = {
+        'mode': 'capped',
+        'cap': 2,
+    }
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = schema.execute('''\
+{
+    pets(first: 1) {
+        nodes {
+            name
+        }
+        pageInfo {
+            hasNextPage
+        }
+    }
+}
+''', context=http.HttpRequest())
+        assert not result.errors
+        assert result.data == {
+            'pets': {
+                'nodes': [{'name': 'pet0'}],
+                'pageInfo': {'hasNextPage': True},
+            }
+        }
+    assert len(ctx.captured_queries) == 1
+
+    result = schema.execute('''\
+{
+    pets(first: 1) {
+        totalCount
+    }
+}
+''', context=http.HttpRequest())
+    assert not result.errors
+    assert result.data == {'pets': {'totalCount': 2}}
@@ -0,0 +1,194 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import datetime
+
+import django.http as http
+import graphene
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='articles')
+def _articles():
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    now = timezone.now()
+    return [
+        models.Article.objects.create(
+            headline=f'article{i // 2}',
+            pub_date=now,
+            pub_date_time=now + datetime.timedelta(microseconds=i),
+            reporter=reporter,
+            editor=reporter,
+        )
+        for i in range(7)
+    ]
+
+
+def _iter_pages(qs, **kwargs):
+    after = None
+    while True:
+        result = gdtools.connection.resolve(
+            qs, keyset=True, after=after, **kwargs)
+        yield result
+        if not result['pageInfo']['has_next_page']:
+            break
+        after = result['pageInfo']['end_cursor']
+
+
+def test_forward(articles):
+    qs = models.Article.objects.all()
+    pages = list(_iter_pages(qs, first=3))
+    assert [list(i['nodes']) for i in pages] == [
+        articles[:3], articles[3:6], articles[6:]]
+    assert pages[0]['totalCount'] == 7
+    assert [i['cursor'] for i in pages[0]['edges']][-1] == (
+        pages[0]['pageInfo']['end_cursor'])
+
+
+def test_backward(articles):
+    qs = models.Article.objects.all()
+    result = gdtools.connection.resolve(qs, keyset=True, last=2)
+    assert list(result['nodes']) == articles[5:]
+    assert result['pageInfo']['has_previous_page']
+    assert not result['pageInfo']['has_next_page']
+    result = gdtools.connection.resolve(
+        qs, keyset=True, last=4, before=result['pageInfo']['start_cursor'])
+    assert list(result['nodes']) == articles[1:5]
+    assert result['pageInfo']['has_previous_page']
+    result = gdtools.connection.resolve(
+        qs, keyset=True, last=4, before=result['pageInfo']['start_cursor'])
+    assert list(result['nodes']) == articles[:1]
+    assert not result['pageInfo']['has_previous_page']
+
+
+def test_mixed_ordering(articles):
+    qs = models.Article.objects.order_by('headline', '-pub_date_time')
+    expected = [articles[i] for i in (1, 0, 3, 2, 5, 4, 6)]
+    pages = list(_iter_pages(qs, first=2))
+    assert [j for i in pages for j in i['nodes']] == expected
+
+
+def test_no_offset(articles):
+    qs = models.Article.objects.all()
+    result = gdtools.connection.resolve(qs, keyset=True, first=2)
+    cursor = str(result['pageInfo']['end_cursor'])
+    with CaptureQueriesContext(connection) as ctx:
+        result = gdtools.connection.resolve(
+            qs, keyset=True, first=2, after=cursor)
+        assert list(result['nodes']) == articles[2:4]
+    assert len(ctx.captured_queries) == 1
+    assert 'OFFSET' not in ctx.captured_queries[0]['sql']
+
+
+def test_invalid_cursor(articles):
+    qs = models.Article.objects.all()
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        gdtools.connection.resolve(
+            qs, keyset=True, first=2, after='YXJyYXljb25uZWN0aW9uOjA=')
+
+
+def test_unsupported_ordering():
+    with pytest.raises(ValueError, match='non-relation field'):
+        gdtools.connection.resolve(
+            models.Article.objects.order_by('reporter'), keyset=True, first=1)
+
+
+def test_optimized_resolve(articles):
+
+    class KeysetArticle(gdtools.Resolver):
+        schema = {'headline': 'String!'}
+        model = models.Article
+
+    class Articles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(KeysetArticle)
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.all()
+            return gdtools.connection.optimized_resolve(
+                self.info, qs, keyset=True, **kwargs)
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+    schema = graphene.Schema(query=Query)
+
+    result = schema.execute('''\
+query articles($after: String) {
+    articles(first: 2, after: $after) {
+        nodes {
+            headline
+        }
+        pageInfo {
+            endCursor
+            hasNextPage
+        }
+    }
+}
+''', context=http.HttpRequest())
+    assert not result.errors
+    assert result.data['articles']['nodes'] == [
+        {'headline': 'article0'}, {'headline': 'article0'}]
+    assert result.data['articles']['pageInfo']['hasNextPage']
+    result = schema.execute('''\
+query articles($after: String) {
+    articles(first: 2, after: $after) {
+        nodes {
+            headline
+        }
+    }
+}
+''', context=http.HttpRequest(), variable_values={
+        'after': result.data['articles']['pageInfo']['endCursor']})
+    assert not result.errors
+    assert result.data['articles']['nodes'] == [
+        {'headline': 'article1'}, {'headline': 'article1'}]
+
+
+def test_optimized_resolve_cursor_only(articles, django_assert_num_queries):
+
+    class KeysetCursorArticle(gdtools.Resolver):
+        schema = {'headline': 'String!'}
+        model = models.Article
+
+    class Articles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(KeysetCursorArticle)
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.order_by('-pub_date_time')
+            return gdtools.connection.optimized_resolve(
+                self.info, qs, keyset=True, **kwargs)
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+    schema = graphene.Schema(query=Query)
+
+    with django_assert_num_queries(1):
+        result = schema.execute('''\
+{
+    articles(first: 5) {
+        edges {
+            cursor
+            node {
+                headline
+            }
+        }
+    }
+}
+''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert [i['node'] for i in result.data['articles']['edges']] == [
+        {'headline': 'article3'},
+        {'headline': 'article2'},
+        {'headline': 'article2'},
+        {'headline': 'article1'},
+        {'headline': 'article1'},
+    ]
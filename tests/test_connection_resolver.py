@@ -11,7 +11,10 @@ from . import models
 @pytest.mark.django_db
 def test_keep_queryset():
 
-    result = gdtools.connection.resolve(models.Pet.objects.all(), first=1,)
+    result = gdtools.connection.resolve(models.Pet.objects.all(), last=1,)
     qs = result['nodes']
     assert isinstance(qs, djm.QuerySet)
     assert qs.model is models.Pet
+    # Page of `first` is evaluated to get `hasNextPage`.
+    result = gdtools.connection.resolve(models.Pet.objects.all(), first=1,)
+    assert isinstance(result['nodes'], list)
@@ -1,6 +1,10 @@
 # pylint:disable=missing-docstring,invalid-name,unused-variable
 
+import concurrent.futures
+
 import pytest
+from django.utils import timezone
+from promise import Promise
 
 import graphene_django_tools as gdtools
 
@@ -9,6 +13,11 @@ from . import models
 pytestmark = [pytest.mark.django_db]
 
 
+def _batch_load_many(loader, keys):
+    # Load inside a promise callback, so keys are dispatched in same batch.
+    return Promise.resolve(None).then(lambda _: loader.load_many(keys)).get()
+
+
 def test_integer_key(django_assert_num_queries):
     reporter1 = models.Reporter.objects.create(
         first_name='reporter1',
@@ -21,3 +30,138 @@ def test_integer_key(django_assert_num_queries):
         assert loader.load(reporter1.pk).get() == reporter1
     with django_assert_num_queries(0):
         assert loader.load(str(reporter1.pk)).get() == reporter1
+
+
+def test_reverse_foreign_key(django_assert_num_queries):
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    reporter3 = models.Reporter.objects.create(
+        first_name='reporter3',
+    )
+    article1 = models.Article.objects.create(
+        headline='article1',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter1,
+        editor=reporter2,
+    )
+    article2 = models.Article.objects.create(
+        headline='article2',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter1,
+        editor=reporter2,
+    )
+    article3 = models.Article.objects.create(
+        headline='article3',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter2,
+        editor=reporter1,
+    )
+    article_loader = gdtools.dataloader.get_for_model(models.Article)
+    loader = gdtools.dataloader.get_for_relation(
+        models.Reporter, 'articles', get_model_loader=lambda model: article_loader)
+    with django_assert_num_queries(1):
+        result = _batch_load_many(
+            loader, [reporter1.pk, str(reporter2.pk), reporter3.pk])
+    assert result == [[article1, article2], [article3], []]
+    with django_assert_num_queries(0):
+        assert article_loader.load(article3.pk).get() == article3
+
+
+def test_many_to_many(django_assert_num_queries):
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    film1 = models.Film.objects.create()
+    film2 = models.Film.objects.create()
+    film1.reporters.add(reporter1, reporter2)
+    film2.reporters.add(reporter2)
+
+    loader = gdtools.dataloader.get_for_relation(models.Film, 'reporters')
+    with django_assert_num_queries(1):
+        result = _batch_load_many(loader, [film1.pk, film2.pk])
+    assert [set(i) for i in result] == [{reporter1, reporter2}, {reporter2}]
+
+    loader = gdtools.dataloader.get_for_relation(models.Reporter, 'films')
+    with django_assert_num_queries(1):
+        result = _batch_load_many(loader, [reporter1.pk, reporter2.pk])
+    assert [set(i) for i in result] == [{film1}, {film1, film2}]
+
+
+def test_relation_to_field(django_assert_num_queries):
+    shelter1 = models.Shelter.objects.create(code='s1')
+    shelter2 = models.Shelter.objects.create(code='s2')
+    kennel1 = models.Kennel.objects.create(shelter=shelter1)
+    kennel2 = models.Kennel.objects.create(shelter=shelter1)
+
+    loader = gdtools.dataloader.get_for_relation(models.Shelter, 'kennels')
+    with django_assert_num_queries(2):
+        result = _batch_load_many(loader, [shelter1.pk, shelter2.pk, 'invalid'])
+    assert result == [[kennel1, kennel2], [], []]
+
+
+def test_single_valued_relation():
+    with pytest.raises(ValueError, match='Relation should be many valued'):
+        gdtools.dataloader.get_for_relation(models.Article, 'reporter')
+
+
+def test_max_batch_size(django_assert_num_queries):
+    pets = [models.Pet.objects.create(name=f'pet{i}', age=i) for i in range(5)]
+    loader = gdtools.dataloader.get_for_model(models.Pet, max_batch_size=2)
+    with django_assert_num_queries(3):
+        result = _batch_load_many(loader, [i.pk for i in reversed(pets)])
+    assert result == pets[::-1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_max_batch_size_executor(monkeypatch):
+    pets = [models.Pet.objects.create(name=f'pet{i}', age=i) for i in range(5)]
+    calls = []
+    close_old_connections = gdtools.dataloader.djdb.close_old_connections
+
+    def _close_old_connections():
+        calls.append(1)
+        close_old_connections()
+
+    monkeypatch.setattr(gdtools.dataloader.djdb, 'close_old_connections', _close_old_connections)
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        loader = gdtools.dataloader.get_for_model(
+            models.Pet, max_batch_size=2, executor=executor)
+        result = _batch_load_many(loader, [i.pk for i in reversed(pets)])
+    assert result == pets[::-1]
+    # Before and after each chunk.
+    assert len(calls) == 6
+
+
+def test_uuid_key(django_assert_num_queries):
+    document1 = models.Document.objects.create(title='document1')
+    document2 = models.Document.objects.create(title='document2')
+    loader = gdtools.dataloader.get_for_model(models.Document)
+    with django_assert_num_queries(1):
+        assert _batch_load_many(loader, [
+            document1.pk,
+            str(document2.pk),
+            document2.pk.hex,
+        ]) == [document1, document2, document2]
+    with django_assert_num_queries(0):
+        assert loader.load(str(document1.pk).upper()).get() == document1
+
+
+def test_missing_key(django_assert_num_queries):
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    loader = gdtools.dataloader.get_for_model(models.Reporter)
+    with django_assert_num_queries(1):
+        assert _batch_load_many(
+            loader, [reporter.pk, reporter.pk + 1, 'invalid']
+        ) == [reporter, None, None]
@@ -0,0 +1,40 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import graphene
+import pytest
+
+import graphene_django_tools as gdtools
+
+ITEMS = [
+    ('User', '1'),
+    ('User', 1),
+    ('Article', 'a:b'),
+    ('文章', '中文'),
+    ('', ''),
+]
+
+
+@pytest.mark.parametrize('type_,value', ITEMS)
+def test_compatible(type_, value):
+    encoded = gdtools.global_id.encode(type_, value)
+    assert encoded == graphene.Node.to_global_id(type_, value)
+    assert gdtools.global_id.decode(encoded) == graphene.Node.from_global_id(
+        encoded)
+    assert str(gdtools.GlobalID(type_, str(value))) == encoded
+
+
+def test_many():
+    encoded = gdtools.global_id.encode_many(ITEMS)
+    assert encoded == [graphene.Node.to_global_id(*i) for i in ITEMS]
+    assert gdtools.global_id.decode_many(encoded) == [
+        (type_, str(value)) for type_, value in ITEMS]
+
+
+@pytest.mark.parametrize('value', ['User:1', 'VXNlcjE=', 1, '5paH'])
+def test_invalid(value):
+    with pytest.raises((TypeError, ValueError)):
+        gdtools.global_id.decode(value)
+    with pytest.raises((TypeError, ValueError)):
+        gdtools.global_id.decode_many([value])
+    with pytest.raises(gdtools.global_id.InvalidGlobalIDError):
+        gdtools.GlobalID.parse(value)
@@ -0,0 +1,117 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='schema')
+def _schema():
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    for i in (reporter1, reporter1, reporter2):
+        models.Article.objects.create(
+            headline=f'article of {i.first_name}',
+            pub_date=timezone.now(),
+            pub_date_time=timezone.now(),
+            reporter=i,
+            editor=i,
+        )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+        }
+
+    class ArticleReporter(gdtools.Resolver):
+        schema = 'Reporter!'
+
+        def resolve(self, **kwargs):
+            return self.get_loader(models.Reporter).load(self.parent.reporter_id)
+
+    class Article(gdtools.Resolver):
+        schema = {
+            'headline': 'String!',
+            'reporter': ArticleReporter,
+        }
+
+    class Articles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            return models.Article.objects.order_by('pk')
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+
+    return graphene.Schema(query=Query)
+
+
+QUERY = '''\
+{
+    articles {
+        headline
+        reporter {
+            firstName
+        }
+    }
+}
+'''
+
+
+def test_execute(schema):
+    result = gdtools.instrumentation.Instrumentation().execute(
+        schema,
+        QUERY,
+        context_value=http.HttpRequest(),
+    )
+    assert not result.errors
+    assert len(result.data['articles']) == 3
+    report = result.extensions['instrumentation']
+    assert report['fields']['articles']['resolves'] == 1
+    # Returned queryset is evaluated by executor after resolve.
+    assert report['fields']['articles']['queries'] == 0
+    assert report['fields']['']['queries'] == 1
+    assert report['fields']['']['time'] > 0
+    assert report['fields']['articles.reporter']['resolves'] == 3
+    assert report['fields']['articles.reporter']['queries'] == 1
+    assert report['fields']['articles.headline']['queries'] == 0
+    assert report['loaders'] == {
+        'tests.Reporter': {
+            'batches': 1,
+            'keys': 2,
+            'max_batch_size': 2,
+            'cache_hits': 0,
+            'cache_misses': 0,
+        }
+    }
+
+
+def test_hook(schema, monkeypatch):
+    reports = []
+    monkeypatch.setattr(gdtools.instrumentation, 'HOOKS', [reports.append])
+    result = gdtools.instrumentation.Instrumentation().execute(
+        schema,
+        QUERY,
+        context_value=http.HttpRequest(),
+    )
+    assert not result.errors
+    assert reports == [result.extensions['instrumentation']]
+
+
+def test_context_manager():
+    with gdtools.instrumentation.Instrumentation() as instrumentation:
+        list(models.Reporter.objects.all())
+    list(models.Reporter.objects.all())
+    assert instrumentation.get_report()['fields']['']['queries'] == 1
@@ -0,0 +1,60 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import pytest
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+
+@pytest.fixture(name='registry')
+def _registry(monkeypatch):
+    ret = gdtools.model_type.Registry()
+    monkeypatch.setattr(gdtools.model_type, 'REGISTRY', ret)
+    return ret
+
+
+def test_lookup(registry):
+    registry[models.Reporter] = 'Reporter'
+    registry[models.Article] = 'Article'
+    assert gdtools.model_type.get_model('Reporter') is models.Reporter
+    assert gdtools.model_type.get_typename(models.Article) == 'Article'
+    assert gdtools.model_type.get_typename(models.CNNReporter) == 'Reporter'
+    with pytest.raises(ValueError, match='Can not determinate model'):
+        gdtools.model_type.get_model('Pet')
+    with pytest.raises(ValueError, match='No typename'):
+        gdtools.model_type.get_typename(models.Pet)
+
+
+def test_register_after_lookup(registry):
+    registry[models.Reporter] = 'Reporter'
+    assert gdtools.model_type.get_typename(models.CNNReporter) == 'Reporter'
+    assert gdtools.model_type.get_models('CNNReporter') == []
+
+    registry[models.CNNReporter] = 'CNNReporter'
+    assert gdtools.model_type.get_typename(models.CNNReporter) == 'CNNReporter'
+    assert gdtools.model_type.get_models('CNNReporter') == [
+        models.CNNReporter]
+    assert gdtools.model_type.get_typename(models.Reporter) == 'Reporter'
+
+
+def test_reregister(registry):
+    registry[models.Reporter] = 'Reporter'
+    registry[models.Reporter] = 'Author'
+    assert gdtools.model_type.get_models('Reporter') == []
+    assert gdtools.model_type.get_model('Author') is models.Reporter
+    assert dict(registry) == {models.Reporter: 'Author'}
+
+    del registry[models.Reporter]
+    assert gdtools.model_type.get_models('Author') == []
+    with pytest.raises(ValueError, match='No typename'):
+        gdtools.model_type.get_typename(models.Reporter)
+
+
+def test_resolver_register(registry):
+
+    class Pet(gdtools.Resolver):
+        schema = {'name': 'String!'}
+        model = models.Pet
+
+    assert gdtools.model_type.get_model('Pet') is models.Pet
@@ -0,0 +1,102 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='schema')
+def _schema():
+    for i in range(3):
+        reporter = models.Reporter.objects.create(
+            first_name=f'reporter{i}',
+        )
+        models.Article.objects.create(
+            headline=f'article{i}',
+            pub_date=timezone.now(),
+            pub_date_time=timezone.now(),
+            reporter=reporter,
+            editor=reporter,
+        )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!'
+        }
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+
+    class Articles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Article, name='NPlusOneArticle')
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.all()
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+    }
+    return graphene.Schema(query=Query)
+
+
+QUERY = '''\
+{
+    articles {
+        nodes {
+            headline
+            reporter {
+                firstName
+            }
+        }
+    }
+}
+'''
+
+
+def test_detect(schema):
+    detector = gdtools.nplusone.Detector()
+    result = detector.execute(schema, QUERY, context_value=http.HttpRequest())
+    assert not result.errors
+    issues = detector.get_issues()
+    assert len(issues) == 1
+    issue = issues[0]
+    assert issue.path == 'articles.nodes.reporter'
+    assert issue.count == 3
+    assert "OPTIMIZATION_OPTIONS['Article']" in issue.suggestion
+    assert "'select': {'reporter': ['reporter']}" in issue.suggestion
+
+
+def test_strict(schema):
+    with pytest.raises(gdtools.nplusone.NPlusOneError) as exc_info:
+        gdtools.nplusone.Detector(strict=True).execute(
+            schema, QUERY, context_value=http.HttpRequest())
+    assert len(exc_info.value.issues) == 1
+
+
+def test_strict_default(schema, monkeypatch):
+    monkeypatch.setattr(gdtools.nplusone, 'STRICT', True)
+    with pytest.raises(gdtools.nplusone.NPlusOneError):
+        gdtools.nplusone.Detector().execute(
+            schema, QUERY, context_value=http.HttpRequest())
+
+
+def test_optimized(schema):
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'select': {'reporter': ['reporter']},
+        'related': {'reporter': 'reporter'},
+    }
+    detector = gdtools.nplusone.Detector(strict=True)
+    result = detector.execute(schema, QUERY, context_value=http.HttpRequest())
+    assert not result.errors
+    assert detector.get_issues() == []
@@ -0,0 +1,144 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import datetime
+
+import django.db.models as djm
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='schema')
+def _schema(request):
+    reporters = [
+        models.Reporter.objects.create(
+            first_name=f'reporter{i}',
+            email=f'reporter{i}@example.com',
+        )
+        for i in range(3)
+    ]
+    reporters[0].friends.add(reporters[1], reporters[2])
+    for index, i in enumerate(reporters):
+        for j in range(index):
+            models.Article.objects.create(
+                headline=f'article{j} of {i.first_name}',
+                pub_date=datetime.date(2020, 1, 1 + j),
+                pub_date_time=timezone.now(),
+                reporter=i,
+                editor=i,
+            )
+
+    class ReporterFriends(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            return self.parent.friends.all()
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'article_count': 'Int!',
+            'last_published': 'String',
+            'friends': ReporterFriends,
+        }
+        model = models.Reporter
+        only = {None: ['reporter_type']}
+        annotate = {
+            'articleCount': {'article_count': djm.Count('articles')},
+            'lastPublished': {'last_published': djm.Max('articles__pub_date')},
+        }
+
+    class Reporters(gdtools.Resolver):
+        schema = gdtools.connection.get_type(
+            Reporter,
+            # Connection type is cached by name.
+            name=request.node.name.title().replace('_', ''),
+        )
+
+        def resolve(self, **kwargs):
+            qs = models.Reporter.objects.order_by('pk')
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+
+    return graphene.Schema(query=Query)
+
+
+def test_annotate(schema, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        result = schema.execute('''\
+    {
+        reporters {
+            nodes {
+                firstName
+                articleCount
+                lastPublished
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert result.data['reporters']['nodes'] == [
+        {'firstName': 'reporter0', 'articleCount': 0, 'lastPublished': None},
+        {'firstName': 'reporter1', 'articleCount': 1, 'lastPublished': '2020-01-01'},
+        {'firstName': 'reporter2', 'articleCount': 2, 'lastPublished': '2020-01-02'},
+    ]
+
+
+def test_not_selected(schema, django_assert_num_queries):
+    with django_assert_num_queries(1) as ctx:
+        result = schema.execute('''\
+    {
+        reporters {
+            nodes {
+                firstName
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert 'COUNT' not in ctx.captured_queries[0]['sql']
+    assert 'tests_article' not in ctx.captured_queries[0]['sql']
+
+
+def test_prefetch(schema, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        result = schema.execute('''\
+    {
+        reporters {
+            nodes {
+                friends {
+                    firstName
+                    articleCount
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert result.data['reporters']['nodes'][0] == {
+        'friends': [
+            {'firstName': 'reporter1', 'articleCount': 1},
+            {'firstName': 'reporter2', 'articleCount': 2},
+        ],
+    }
+
+
+@pytest.mark.parametrize('annotate,message', [
+    ({'articleCount': {'article_count': 'articles'}}, 'not a expression'),
+    ({'articleCount': {'email': djm.Count('articles')}}, 'conflicts with field'),
+    ({'articleCount': djm.Count('articles')}, 'expect alias to expression map'),
+])
+def test_invalid(annotate, message):
+    with pytest.raises(gdtools.queryset.OptimizationOptionError) as exc_info:
+        gdtools.queryset.register_optimization_option(
+            'Reporter', {'annotate': annotate}, model=models.Reporter)
+    assert message in str(exc_info.value)
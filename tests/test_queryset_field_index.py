@@ -0,0 +1,49 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable,protected-access
+
+from django.apps import apps
+
+from graphene_django_tools import model_field
+
+from . import models
+
+
+def test_default_only_lookups():
+    assert model_field._get_default_only_lookups(
+        'firstName', models.Reporter, 'self') == ['first_name']
+    assert model_field._get_default_only_lookups(
+        'first_name', models.Reporter, 'self') == ['first_name']
+    assert model_field._get_default_only_lookups(
+        'firstName', models.Article, 'reporter') == ['first_name']
+    assert model_field._get_default_only_lookups(
+        'reporter', models.Article, 'self') == ['reporter_id']
+    assert model_field._get_default_only_lookups(
+        'notExists', models.Article, 'self') == []
+    assert model_field._get_default_only_lookups(
+        'notExists', models.Article, 'headline') == []
+    assert model_field._get_default_only_lookups(
+        'content', models.Tag, 'self') == []
+
+
+def test_memoized(monkeypatch):
+    model_field._FIELD_INDEX.clear()
+    calls = []
+    get_field = models.Reporter._meta.get_field
+
+    def _get_field(name, *args, **kwargs):
+        calls.append(name)
+        return get_field(name, *args, **kwargs)
+    monkeypatch.setattr(models.Reporter._meta, 'get_field', _get_field)
+
+    for _ in range(3):
+        assert model_field._get_default_only_lookups(
+            'notExists', models.Reporter, 'self') == []
+        assert model_field._get_model_field(
+            models.Reporter, 'first_name').attname == 'first_name'
+    assert calls == ['notExists', 'not_exists', 'first_name']
+
+
+def test_invalidate_on_app_registry_change():
+    index = model_field._get_field_index(models.Reporter)
+    assert model_field._get_field_index(models.Reporter) is index
+    apps.clear_cache()
+    assert model_field._get_field_index(models.Reporter) is not index
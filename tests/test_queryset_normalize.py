@@ -0,0 +1,104 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import logging
+
+import django.db.models as djm
+import pytest
+
+from graphene_django_tools import optimization
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_drop_redundant():
+    ret = optimization._normalize_optimization({
+        'only': ['headline', 'headline', 'reporter__email', 'editor__email'],
+        'select': ['reporter', 'reporter'],
+        'prefetch': ['reporter__friends', 'reporter__friends__friends'],
+    }, models.Article)
+    assert ret == {
+        'only': ['headline', 'reporter__email'],
+        'select': ['reporter'],
+        'prefetch': ['reporter__friends__friends'],
+        'annotate': {},
+    }
+    list(models.Article.objects
+         .only(*ret['only'])
+         .select_related(*ret['select'])
+         .prefetch_related(*ret['prefetch']))
+
+
+def test_collapse_select_prefix():
+    ret = optimization._normalize_optimization({
+        'only': [],
+        'select': ['film', 'film'],
+        'prefetch': [],
+    }, models.FilmDetails)
+    assert ret['select'] == ['film']
+
+
+def test_single_valued_prefetch_to_select():
+    ret = optimization._normalize_optimization({
+        'only': ['headline'],
+        'select': [],
+        'prefetch': ['reporter', 'friends'],
+    }, models.Article)
+    assert ret == {
+        'only': ['headline', 'reporter_id'],
+        'select': ['reporter'],
+        'prefetch': ['friends'],
+        'annotate': {},
+    }
+
+
+def test_single_valued_optimized_prefetch_to_select():
+    inner = optimization._OptimizedPrefetch('reporter', models.Reporter, {
+        'only': ['email'],
+        'select': [],
+        'prefetch': ['friends'],
+    })
+    ret = optimization._normalize_optimization({
+        'only': ['headline'],
+        'select': [],
+        'prefetch': [inner],
+    }, models.Article)
+    assert ret == {
+        'only': ['headline', 'reporter_id', 'reporter__email'],
+        'select': ['reporter'],
+        'prefetch': ['reporter__friends'],
+        'annotate': {},
+    }
+    list(models.Article.objects
+         .only(*ret['only'])
+         .select_related(*ret['select'])
+         .prefetch_related(*ret['prefetch']))
+
+
+def test_prefetch_object_wins():
+    prefetch = djm.Prefetch('friends', models.Reporter.objects.all())
+    ret = optimization._normalize_optimization({
+        'only': [],
+        'select': [],
+        'prefetch': ['friends__articles', 'friends', prefetch],
+    }, models.Reporter)
+    assert ret['prefetch'] == [prefetch, 'friends__articles']
+
+
+def test_warn_deferred_prefetch(caplog):
+    with caplog.at_level(logging.WARNING, logger=optimization.__name__):
+        optimization._normalize_optimization({
+            'only': ['headline'],
+            'select': [],
+            'prefetch': ['reporter__friends'],
+        }, models.Article)
+    assert 'reporter_id' in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger=optimization.__name__):
+        optimization._normalize_optimization({
+            'only': ['headline', 'reporter_id'],
+            'select': [],
+            'prefetch': ['reporter__friends'],
+        }, models.Article)
+    assert not caplog.text
@@ -0,0 +1,141 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+
+@pytest.fixture(name='schema')
+def _schema():
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!'
+        }
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+
+    class Articles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.all()
+            return gdtools.queryset.optimize(qs, self.info)
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'select': {'reporter': ['reporter']},
+        'related': {'reporter': 'reporter'},
+    }
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+    }
+    gdtools.queryset.clear_plan_cache()
+    return graphene.Schema(query=Query)
+
+
+QUERY = '''\
+{
+    articles{
+        headline
+        reporter{
+            firstName
+        }
+    }
+}
+'''
+
+
+@pytest.mark.django_db
+def test_cache_hit(schema, django_assert_num_queries):
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    models.Article.objects.create(
+        headline='article1',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter,
+        editor=reporter,
+    )
+
+    for _ in range(3):
+        with django_assert_num_queries(1):
+            result = schema.execute(QUERY)
+        assert not result.errors
+        assert result.data == {
+            'articles': [{
+                'headline': 'article1',
+                'reporter': {'firstName': 'reporter1'},
+            }]
+        }
+    info = gdtools.queryset.get_plan_cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+    assert info.currsize == 1
+
+
+@pytest.mark.django_db
+def test_cache_invalidate_on_option_change(schema):
+    result = schema.execute(QUERY)
+    assert not result.errors
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {}
+    result = schema.execute(QUERY)
+    assert not result.errors
+    info = gdtools.queryset.get_plan_cache_info()
+    assert info.misses == 2
+    assert info.hits == 0
+
+
+def test_option_lists_not_modified():
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+    }
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!'
+        }
+
+    class Reporters(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            optimization = gdtools.queryset.get_optimization(
+                self.info, models.Reporter)
+            assert optimization['only'] == ['reporter_type', 'first_name']
+            return []
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+
+    schema = graphene.Schema(query=Query)
+    for _ in range(2):
+        gdtools.queryset.clear_plan_cache()
+        result = schema.execute('{ reporters { firstName } }')
+        assert not result.errors
+    assert gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter']['only'] == {
+        None: ('reporter_type',)}
+
+
+def test_option_modify_in_place():
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'only': {None: ['headline']},
+    }
+    option = gdtools.queryset.OPTIMIZATION_OPTIONS['Article']
+    with pytest.raises(TypeError):
+        option['related']['reporter'] = 'reporter'  # type: ignore
+    with pytest.raises(AttributeError):
+        option['only'][None].append('reporter')  # type: ignore
+    version = gdtools.queryset.OPTIMIZATION_OPTIONS.version  # type: ignore
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        **option, 'related': {'reporter': 'reporter'}}
+    assert gdtools.queryset.OPTIMIZATION_OPTIONS.version > version  # type: ignore
+    assert gdtools.queryset.OPTIMIZATION_OPTIONS['Article']['related'] == {
+        'reporter': 'reporter'}
@@ -0,0 +1,195 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='schema')
+def _schema():
+    class Node(gdtools.Resolver):
+        schema = {
+            'pk': 'Int!',
+        }
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {
+                'pk': 'Int!',
+                'first_name': 'String!',
+                'email': 'String!',
+            },
+            'interfaces': (Node,),
+        }
+        model = models.Reporter
+
+    class Article(gdtools.Resolver):
+        schema = {
+            'type': {
+                'pk': 'Int!',
+                'headline': 'String!',
+                'reporter': 'Reporter!',
+            },
+            'interfaces': (Node,),
+        }
+        model = models.Article
+
+    def _resolve(info):
+        optimizations = gdtools.queryset.get_optimizations(info)
+        ret = []
+        for model in (models.Article, models.Reporter):
+            qs = model.objects.order_by('pk')
+            qs = gdtools.queryset.apply_optimization(qs, optimizations[model])
+            ret.extend(qs)
+        return ret
+
+    class Feed(gdtools.Resolver):
+        schema = [(Article, Reporter)]
+
+        def resolve(self, **kwargs):
+            return _resolve(self.info)
+
+    class Nodes(gdtools.Resolver):
+        schema = ['Node!']
+
+        def resolve(self, **kwargs):
+            return _resolve(self.info)
+
+    class Query(graphene.ObjectType):
+        feed = Feed.as_field()
+        nodes = Nodes.as_field()
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'select': {'reporter': ['reporter']},
+        'related': {'reporter': 'reporter'},
+    }
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+    }
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+        email='reporter1@example.com',
+    )
+    models.Article.objects.create(
+        headline='article1',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter,
+        editor=reporter,
+    )
+    return graphene.Schema(query=Query, types=[Article.as_type(), Reporter.as_type()])
+
+
+def test_union(schema, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        result = schema.execute(
+            '''\
+fragment ReporterDetail on Reporter {
+    email
+}
+
+{
+    feed {
+        __typename
+        ... on Article {
+            headline
+            reporter {
+                firstName
+            }
+        }
+        ... on Reporter {
+            firstName
+            ...ReporterDetail
+        }
+    }
+}
+''',
+            context_value=http.HttpRequest(),
+        )
+    assert not result.errors
+    assert result.data == {
+        'feed': [
+            {
+                '__typename': 'Article',
+                'headline': 'article1',
+                'reporter': {'firstName': 'reporter1'},
+            },
+            {
+                '__typename': 'Reporter',
+                'firstName': 'reporter1',
+                'email': 'reporter1@example.com',
+            },
+        ]
+    }
+
+
+def test_interface(schema, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        result = schema.execute(
+            '''\
+{
+    nodes {
+        pk
+        ... on Article {
+            headline
+        }
+        ... on Reporter {
+            email
+        }
+    }
+}
+''',
+            context_value=http.HttpRequest(),
+        )
+    assert not result.errors
+    assert result.data == {
+        'nodes': [
+            {'pk': models.Article.objects.get().pk, 'headline': 'article1'},
+            {'pk': models.Reporter.objects.get().pk, 'email': 'reporter1@example.com'},
+        ]
+    }
+
+
+def test_plan_per_type(schema):
+    captured = {}
+
+    class Capture(gdtools.Resolver):
+        schema = ['Node!']
+
+        def resolve(self, **kwargs):
+            captured.update(gdtools.queryset.get_optimizations(self.info))
+            return []
+
+    class Query(graphene.ObjectType):
+        capture = Capture.as_field()
+
+    result = graphene.Schema(query=Query, types=schema.types).execute('''\
+{
+    capture {
+        ... on Article {
+            headline
+            reporter {
+                firstName
+            }
+        }
+        ... on Reporter {
+            email
+        }
+    }
+}
+''')
+    assert not result.errors
+    article = captured[models.Article]
+    assert sorted(article['only']) == [
+        'headline', 'reporter__first_name', 'reporter__reporter_type', 'reporter_id']
+    assert article['select'] == ['reporter']
+    reporter = captured[models.Reporter]
+    assert sorted(reporter['only']) == ['email', 'reporter_type']
+    assert reporter['select'] == []
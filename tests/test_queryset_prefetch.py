@@ -0,0 +1,231 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import django.db.models as djm
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(name='captured')
+def _captured():
+    return []
+
+
+@pytest.fixture(name='schema')
+def _schema(request, captured):
+    reporters = [
+        models.Reporter.objects.create(
+            first_name=f'reporter{i}',
+            email=f'reporter{i}@example.com',
+        )
+        for i in range(3)
+    ]
+    reporters[0].friends.add(reporters[1], reporters[2])
+    for i in reporters:
+        for j in range(2):
+            models.Article.objects.create(
+                headline=f'article{j} of {i.first_name}',
+                pub_date=timezone.now(),
+                pub_date_time=timezone.now(),
+                reporter=i,
+                editor=i,
+            )
+
+    class ReporterFriends(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            return self.parent.friends.all()
+
+    class ReporterArticles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            return self.parent.articles.all()
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'email': 'String!',
+            'friends': ReporterFriends,
+            'articles': ReporterArticles,
+        }
+        model = models.Reporter
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+
+    class Reporters(gdtools.Resolver):
+        schema = gdtools.connection.get_type(
+            Reporter,
+            # Connection type is cached by name.
+            name=request.node.name.title().replace('_', ''),
+        )
+
+        def resolve(self, **kwargs):
+            qs = models.Reporter.objects.order_by('pk')
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Capture(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            captured.append(gdtools.queryset.get_optimization(
+                self.info, models.Reporter))
+            return []
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+        capture = Capture.as_field()
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'select': {'reporter': ['reporter']},
+        'related': {'reporter': 'reporter'},
+    }
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+        'prefetch': {'friends': ['friends'], 'articles': ['articles']},
+        'related': {'friends': 'friends', 'articles': 'articles'},
+    }
+    return graphene.Schema(query=Query)
+
+
+def test_nested(schema, django_assert_num_queries):
+    # reporters, friends, friends of friends, articles of friends.
+    with django_assert_num_queries(4):
+        result = schema.execute('''\
+{
+    reporters(first: 1) {
+        nodes {
+            firstName
+            friends {
+                firstName
+                friends {
+                    firstName
+                }
+                articles {
+                    headline
+                    reporter {
+                        firstName
+                    }
+                }
+            }
+        }
+    }
+}
+''', context_value=http.HttpRequest())
+    assert not result.errors
+    friends = result.data['reporters']['nodes'][0]['friends']
+    assert [i['firstName'] for i in friends] == ['reporter1', 'reporter2']
+    assert friends[0]['friends'] == [{'firstName': 'reporter0'}]
+    assert friends[0]['articles'] == [
+        {'headline': 'article0 of reporter1', 'reporter': {'firstName': 'reporter1'}},
+        {'headline': 'article1 of reporter1', 'reporter': {'firstName': 'reporter1'}},
+    ]
+
+
+def test_prefetch_queryset(schema, captured):
+    result = schema.execute('''\
+{
+    capture {
+        friends {
+            firstName
+        }
+        a: friends {
+            email
+        }
+        articles {
+            headline
+        }
+    }
+}
+''', context_value=http.HttpRequest())
+    assert not result.errors
+    friends, articles = captured[0]['prefetch']
+    assert isinstance(friends, djm.Prefetch)
+    assert friends.prefetch_to == 'friends'
+    assert set(friends.queryset.query.deferred_loading[0]) == {
+        'first_name', 'email', 'reporter_type'}
+    assert isinstance(articles, djm.Prefetch)
+    assert articles.prefetch_to == 'articles'
+    assert set(articles.queryset.query.deferred_loading[0]) == {
+        'headline', 'reporter_id'}
+
+
+def test_merge_nodes_and_edges(schema, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        result = schema.execute('''\
+{
+    reporters(first: 1) {
+        nodes {
+            friends {
+                firstName
+            }
+        }
+        edges {
+            node {
+                friends {
+                    email
+                }
+            }
+        }
+    }
+}
+''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert result.data['reporters']['edges'][0]['node']['friends'] == [
+        {'email': 'reporter1@example.com'},
+        {'email': 'reporter2@example.com'},
+    ]
+
+
+def test_projection_covered():
+    def _get_projection(only):
+        return gdtools.optimization._get_projection({
+            'only': ['first_name'],
+            'select': [],
+            'prefetch': [gdtools.optimization._OptimizedPrefetch(
+                'friends', models.Reporter, {
+                    'only': only,
+                    'select': [],
+                    'prefetch': [],
+                })],
+        })
+
+    less = _get_projection(['first_name'])
+    more = _get_projection(['first_name', 'email'])
+    assert gdtools.optimization._is_projection_covered(less, more)
+    assert not gdtools.optimization._is_projection_covered(more, less)
+    plain = gdtools.optimization._get_projection({
+        'only': ['first_name'],
+        'select': [],
+        'prefetch': ['friends'],
+    })
+    assert not gdtools.optimization._is_projection_covered(plain, more)
+    # Plain prefetch loads all fields.
+    assert gdtools.optimization._is_projection_covered(more, plain)
+
+
+def test_projection_covered_all_fields():
+    def _get_projection(only, select=()):
+        return gdtools.optimization._get_projection({
+            'only': only,
+            'select': list(select),
+            'prefetch': [],
+        })
+
+    all_fields = _get_projection([])
+    some_fields = _get_projection(['first_name'])
+    assert gdtools.optimization._is_projection_covered(some_fields, all_fields)
+    assert not gdtools.optimization._is_projection_covered(all_fields, some_fields)
+    # Root fields are deferred when only relation is selected.
+    selected = _get_projection([], ['reporter'])
+    assert not gdtools.optimization._is_projection_covered(all_fields, selected)
+    assert not gdtools.optimization._is_projection_covered(selected, all_fields)
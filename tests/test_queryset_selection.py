@@ -0,0 +1,230 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import types
+
+import graphene
+import graphql
+import pytest
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+
+@pytest.fixture(name='captured')
+def _captured():
+    return []
+
+
+@pytest.fixture(name='schema')
+def _schema(captured):
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'last_name': 'String!',
+            'email': 'String!',
+        }
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+
+    class Articles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            captured.append(gdtools.queryset.get_optimization(
+                self.info, models.Article))
+            captured.append(gdtools.queryset.get_optimization(
+                self.info, models.Reporter, ['reporter']))
+            return []
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Article'] = {
+        'select': {'reporter': ['reporter']},
+        'related': {'reporter': 'reporter'},
+    }
+    gdtools.queryset.clear_plan_cache()
+    return graphene.Schema(query=Query)
+
+
+def _execute(schema, captured, query, **kwargs):
+    captured.clear()
+    result = schema.execute(query, **kwargs)
+    assert not result.errors
+    return captured
+
+
+def test_path(schema, captured):
+    article, reporter = _execute(schema, captured, '''\
+{
+    articles {
+        headline
+        reporter {
+            firstName
+        }
+    }
+}
+''')
+    assert sorted(article['only']) == ['headline', 'reporter__first_name', 'reporter_id']
+    assert article['select'] == ['reporter']
+    assert reporter['only'] == ['first_name']
+
+
+def test_merge_response_key(schema, captured):
+    article, reporter = _execute(schema, captured, '''\
+fragment ArticleReporter on Article {
+    reporter {
+        lastName
+    }
+}
+
+{
+    articles {
+        reporter {
+            firstName
+        }
+        ...ArticleReporter
+        ... on Article {
+            reporter {
+                email
+            }
+        }
+    }
+}
+''')
+    assert sorted(article['only']) == [
+        'reporter__email', 'reporter__first_name', 'reporter__last_name', 'reporter_id']
+    assert sorted(reporter['only']) == ['email', 'first_name', 'last_name']
+
+
+QUERY_DIRECTIVE = '''\
+query articles($withReporter: Boolean!, $withoutEmail: Boolean!) {
+    articles {
+        headline
+        reporter @include(if: $withReporter) {
+            firstName
+            email @skip(if: $withoutEmail)
+        }
+        lastName: headline @skip(if: true)
+    }
+}
+'''
+
+
+def test_directive(schema, captured):
+    article, reporter = _execute(
+        schema, captured, QUERY_DIRECTIVE,
+        variables={'withReporter': False, 'withoutEmail': False})
+    assert article['only'] == ['headline']
+    assert article['select'] == []
+
+    article, reporter = _execute(
+        schema, captured, QUERY_DIRECTIVE,
+        variables={'withReporter': True, 'withoutEmail': True})
+    assert sorted(article['only']) == ['headline', 'reporter__first_name', 'reporter_id']
+    assert article['select'] == ['reporter']
+
+    article, reporter = _execute(
+        schema, captured, QUERY_DIRECTIVE,
+        variables={'withReporter': True, 'withoutEmail': False})
+    assert sorted(reporter['only']) == ['email', 'first_name']
+
+    article, reporter = _execute(
+        schema, captured, QUERY_DIRECTIVE,
+        variables={'withReporter': False, 'withoutEmail': True})
+    assert article['only'] == ['headline']
+    info = gdtools.queryset.get_plan_cache_info()
+    assert info.misses == 8
+    assert info.hits == 0
+
+
+def test_directive_walker_variables(schema):
+    document = graphql.parse('''\
+query Q($withReporter: Boolean!, $token: String) {
+    articles @include(if: $withReporter) {
+        headline
+    }
+}
+''')
+    gdtools.selection._clear_document_cache()
+    info = types.SimpleNamespace(
+        schema=schema,
+        operation=document.definitions[0],
+        fragments={},
+        variable_values={'withReporter': 1, 'token': 'secret'},
+    )
+    walker, values = gdtools.selection._get_walker(info, 10)
+    assert values == (True,)
+    # Cached walker only keeps directive variables.
+    assert walker.variables == {'withReporter': True}
+
+
+def test_directive_multiple_operation(schema, captured):
+    query = '''\
+query A($withReporter: Boolean!) {
+    articles {
+        headline
+        reporter @include(if: $withReporter) {
+            firstName
+        }
+    }
+}
+
+query B($withEmail: Boolean!) {
+    articles {
+        reporter {
+            lastName
+            email @include(if: $withEmail)
+        }
+    }
+}
+'''
+    _execute(schema, captured, query, operation_name='A',
+             variable_values={'withReporter': True})
+    article, reporter = _execute(schema, captured, query, operation_name='B',
+                                 variable_values={'withEmail': True})
+    assert sorted(reporter['only']) == ['email', 'last_name']
+    article, reporter = _execute(schema, captured, query, operation_name='B',
+                                 variable_values={'withEmail': False})
+    assert sorted(reporter['only']) == ['last_name']
+
+
+def test_fragment_expanded_once(schema, captured, monkeypatch):
+    calls = []
+    collect = gdtools.selection._SelectionWalker._collect
+
+    def _collect(self, selection_set, *args):
+        calls.append(selection_set)
+        return collect(self, selection_set, *args)
+
+    monkeypatch.setattr(gdtools.selection._SelectionWalker, '_collect', _collect)
+    query = '''\
+fragment ReporterName on Reporter {
+    firstName
+    lastName
+}
+
+{
+    articles {
+        reporter {
+            ...ReporterName
+        }
+        a: reporter {
+            ...ReporterName
+        }
+        b: reporter {
+            ...ReporterName
+        }
+    }
+}
+'''
+    article, reporter = _execute(schema, captured, query)
+    assert sorted(reporter['only']) == ['first_name', 'last_name']
+    fragment_calls = [i for i in calls if len(i.selections) == 2]
+    assert len(fragment_calls) == 1
+
+    calls.clear()
+    _execute(schema, captured, query)
+    assert calls == []
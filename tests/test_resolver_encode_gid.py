@@ -0,0 +1,92 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import types
+
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_simple(monkeypatch):
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    for i in range(3):
+        models.Article.objects.create(
+            headline=f'article{i}',
+            pub_date=timezone.now(),
+            pub_date_time=timezone.now(),
+            reporter=reporter,
+            editor=reporter,
+        )
+
+    class ReporterID(gdtools.Resolver):
+        schema = 'ID!'
+
+        def resolve(self, **kwargs):
+            return self.encode_gid(self.parent)
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'id': ReporterID,
+        }
+        model = models.Reporter
+
+    class Article(gdtools.Resolver):
+        schema = {'reporter': 'Reporter!'}
+        model = models.Article
+
+    class Articles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            return models.Article.objects.select_related('reporter')
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+    schema = graphene.Schema(query=Query)
+
+    expected = str(gdtools.GlobalID.from_object(reporter))
+    calls = []
+    encode = gdtools.global_id.encode
+
+    def _encode(*args):
+        calls.append(args)
+        return encode(*args)
+    monkeypatch.setattr(gdtools.global_id, 'encode', _encode)
+
+    result = schema.execute('''\
+{
+    articles {
+        reporter {
+            id
+        }
+    }
+}
+''', context=http.HttpRequest())
+    assert not result.errors
+    assert result.data == {
+        'articles': [{'reporter': {'id': expected}}] * 3
+    }
+    assert calls == [('Reporter', str(reporter.pk))]
+
+
+def test_encode_gids():
+    class Reporter(gdtools.Resolver):
+        schema = {'first_name': 'String!'}
+        model = models.Reporter
+
+    reporters = [
+        models.Reporter.objects.create(first_name=f'reporter{i}') for i in range(3)]
+    resolver = gdtools.Resolver(
+        info=types.SimpleNamespace(context=http.HttpRequest()))
+    expected = [str(gdtools.GlobalID.from_object(i)) for i in reporters]
+    assert resolver.encode_gid(reporters[1]) == expected[1]
+    assert resolver.encode_gids([*reporters, reporters[0]]) == [*expected, expected[0]]
@@ -69,3 +69,77 @@ query getReporters($id1: ID, $id2: ID){
                 'firstName': 'reporter2'
             }
         }
+
+
+def test_relation(django_assert_num_queries):
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    for i in (reporter1, reporter2):
+        models.Article.objects.create(
+            headline=f'article of {i.first_name}',
+            pub_date=timezone.now(),
+            pub_date_time=timezone.now(),
+            reporter=i,
+            editor=i,
+        )
+
+    class Article(gdtools.Resolver):
+        schema = {
+            'headline': 'String!'
+        }
+
+    class ReporterArticles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            return self.get_loader(models.Reporter, 'articles').load(self.parent.pk)
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'articles': ReporterArticles,
+        }
+
+    class Reporters(gdtools.Resolver):
+        schema = ['Reporter!']
+
+        def resolve(self, **kwargs):
+            return models.Reporter.objects.order_by('pk')
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+
+    schema = graphene.Schema(
+        query=Query,
+    )
+    with django_assert_num_queries(2):
+        result = schema.execute(
+            '''\
+{
+    reporters {
+        firstName
+        articles {
+            headline
+        }
+    }
+}
+''',
+            context=http.HttpRequest(),
+        )
+        assert not result.errors
+        assert result.data == {
+            'reporters': [
+                {
+                    'firstName': 'reporter1',
+                    'articles': [{'headline': 'article of reporter1'}],
+                },
+                {
+                    'firstName': 'reporter2',
+                    'articles': [{'headline': 'article of reporter2'}],
+                },
+            ]
+        }
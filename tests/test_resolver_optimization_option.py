@@ -0,0 +1,209 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+import django.http as http
+import graphene
+import pytest
+from django.utils import timezone
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_declared_option(django_assert_num_queries):
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+        email='user@example.com',
+    )
+    models.Article.objects.create(
+        headline='article1',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter,
+        editor=reporter,
+    )
+
+    class Reporter(gdtools.Resolver):
+        schema = {'first_name': 'String!'}
+        model = models.Reporter
+        only = {None: ['reporter_type']}
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+        model = models.Article
+        select = {'reporter': ['reporter']}
+        related = {'reporter': 'reporter'}
+
+    class Articles(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Article, name='DeclaredArticleConnection')
+
+        def resolve(self, **kwargs):
+            qs = models.Article.objects.all()
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        articles = Articles.as_field()
+    schema = graphene.Schema(query=Query)
+
+    option = gdtools.queryset.get_optimization_option('Article')
+    assert option['select'] == {'reporter': ('reporter',)}
+    with pytest.raises(TypeError):
+        option['select']['headline'] = ['reporter']  # type: ignore
+
+    with django_assert_num_queries(1):
+        result = schema.execute('''\
+    {
+        articles{
+            nodes {
+                headline
+                reporter{
+                    firstName
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert result.data == {
+        'articles': {
+            'nodes': [{'headline': 'article1', 'reporter': {'firstName': 'reporter1'}}],
+        },
+    }
+
+
+def test_global_option_preferred():
+    class Reporter(gdtools.Resolver):
+        schema = {'first_name': 'String!'}
+        model = models.Reporter
+        only = {None: ['reporter_type']}
+
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {'only': {None: ['email']}}
+    assert gdtools.queryset.get_optimization_option(
+        'Reporter')['only'] == {None: ('email',)}
+
+
+@pytest.mark.parametrize('option,message', [
+    ({'select': {'reporter': ['reporterr']}}, 'select.reporter: reporterr: field not exists'),
+    ({'select': {'reporter': ['headline']}}, 'not a foreign key or one-to-one relation'),
+    ({'select': {'reporter': 'reporter'}}, 'expect lookup list'),
+    ({'prefetch': {'reporter': ['reporter__friends__email']}}, 'not a relation'),
+    ({'only': {'reporter': ['reporter__emails']}}, 'field not exists'),
+    ({'related': {'reporter': 'reporters'}}, 'related.reporter: reporters'),
+    ({'only': {'title': ['headline']}}, 'only.title: field not exists on type'),
+])
+def test_invalid_option(option, message):
+    with pytest.raises(gdtools.queryset.OptimizationOptionError) as exc_info:
+        class Article(gdtools.Resolver):
+            schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+            model = models.Article
+            locals().update(option)
+    assert message in str(exc_info.value)
+
+
+def test_register_unknown_option():
+    with pytest.raises(gdtools.queryset.OptimizationOptionError) as exc_info:
+        gdtools.queryset.register_optimization_option(
+            'Article', {'selected': {}}, model=models.Article)
+    assert 'unknown option: selected' in str(exc_info.value)
+
+
+def test_inferred_option(django_assert_num_queries):
+    for i in range(2):
+        reporter = models.Reporter.objects.create(
+            first_name=f'reporter{i}',
+            email=f'reporter{i}@example.com',
+        )
+        for j in range(2):
+            models.Article.objects.create(
+                headline=f'article{j}',
+                pub_date=timezone.now(),
+                pub_date_time=timezone.now(),
+                reporter=reporter,
+                editor=reporter,
+            )
+
+    class ReporterArticles(gdtools.Resolver):
+        schema = ['Article!']
+
+        def resolve(self, **kwargs):
+            return self.parent.articles.all()
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'first_name': 'String!',
+            'email': 'String!',
+            'articles': ReporterArticles,
+        }
+        model = models.Reporter
+        only = {None: ['reporter_type']}
+
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!', 'pub_date': 'String!'}
+        model = models.Article
+
+    class Reporters(gdtools.Resolver):
+        schema = gdtools.connection.get_type(Reporter, name='InferredReporterConnection')
+
+        def resolve(self, **kwargs):
+            qs = models.Reporter.objects.order_by('pk')
+            return gdtools.connection.optimized_resolve(self.info, qs, **kwargs)
+
+    class Query(graphene.ObjectType):
+        reporters = Reporters.as_field()
+    schema = graphene.Schema(query=Query)
+
+    assert gdtools.queryset.get_optimization_option('Article')['select'] == {
+        'reporter': ('reporter',)}
+    assert gdtools.queryset.get_optimization_option('Reporter')['prefetch'] == {
+        'articles': ('articles',)}
+
+    with django_assert_num_queries(2):
+        result = schema.execute('''\
+    {
+        reporters{
+            nodes {
+                firstName
+                articles {
+                    headline
+                    reporter {
+                        firstName
+                    }
+                }
+            }
+        }
+    }
+    ''', context_value=http.HttpRequest())
+    assert not result.errors
+    assert result.data['reporters']['nodes'][1] == {
+        'firstName': 'reporter1',
+        'articles': [
+            {'headline': 'article0', 'reporter': {'firstName': 'reporter1'}},
+            {'headline': 'article1', 'reporter': {'firstName': 'reporter1'}},
+        ],
+    }
+
+
+def test_declared_option_preferred_over_inferred():
+    class Article(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'Reporter!'}
+        model = models.Article
+        select = {'reporter': []}
+
+    option = gdtools.queryset.get_optimization_option('Article')
+    assert option['select'] == {'reporter': ()}
+    assert option['related'] == {'reporter': 'reporter'}
+
+
+def test_inferred_option_forward_reference():
+    class FwdArticle(gdtools.Resolver):
+        schema = {'headline': 'String!', 'reporter': 'FwdReporter', 'reporter_id': 'ID'}
+        model = models.Article
+
+    class FwdReporter(gdtools.Resolver):
+        schema = {'first_name': 'String!'}
+        model = models.Reporter
+
+    option = gdtools.queryset.get_optimization_option('FwdArticle')
+    assert option['select'] == {'reporter': ('reporter',)}
+    assert option['related'] == {'reporter': 'reporter'}
@@ -1,9 +1,14 @@
 
+import types
+
 import django.http as http
 import graphene
 import pytest
 # pylint:disable=missing-docstring,invalid-name,unused-variable
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from promise import Promise
 
 import graphene_django_tools as gdtools
 
@@ -70,3 +75,258 @@ query getReporters($id1: ID, $id2: ID){
                 'firstName': 'reporter2'
             }
         }
+
+
+def test_optimize():
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+        email='reporter1@example.com',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+        email='reporter2@example.com',
+    )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {'first_name': 'String!', 'email': 'String!'},
+        }
+        model = models.Reporter
+
+    class GetReporter(gdtools.Resolver):
+        schema = {
+            'args': {
+                'id': 'ID'
+            },
+            'type': 'Reporter'
+        }
+
+        def resolve(self, **kwargs):
+            return self.resolve_gid(kwargs['id'], optimize=True)
+
+    class Query(graphene.ObjectType):
+        get_reporter = GetReporter.as_field()
+
+    schema = graphene.Schema(
+        query=Query,
+    )
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        # Accessed in `models.Reporter.__init__`.
+        'only': {None: ['reporter_type']},
+    }
+    with CaptureQueriesContext(connection) as ctx:
+        result = schema.execute(
+            '''\
+query getReporters($id1: ID, $id2: ID){
+    reporter1: getReporter(id: $id1) {
+        firstName
+        email
+    }
+    reporter2: getReporter(id: $id2) {
+        firstName
+    }
+}
+''',
+            context=http.HttpRequest(),
+            variables={
+                'id1': gdtools.GlobalID.from_object(reporter1),
+                'id2': gdtools.GlobalID.from_object(reporter2),
+            }
+        )
+        assert not result.errors
+        assert result.data == {
+            'reporter1': {
+                'firstName': 'reporter1',
+                'email': 'reporter1@example.com',
+            },
+            'reporter2': {
+                'firstName': 'reporter2'
+            }
+        }
+    # Loader for `reporter1` covers fields that `reporter2` requires.
+    assert len(ctx.captured_queries) == 1
+    sql = ctx.captured_queries[0]['sql']
+    assert '"email"' in sql
+    assert '"last_name"' not in sql
+
+
+def test_optimize_deferred_field(django_assert_num_queries):
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+        email='reporter1@example.com',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+        email='reporter2@example.com',
+    )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {'first_name': 'String!', 'email': 'String!'},
+        }
+        model = models.Reporter
+
+    class GetReporter(gdtools.Resolver):
+        schema = {
+            'args': {
+                'id': 'ID'
+            },
+            'type': 'Reporter'
+        }
+
+        def resolve(self, **kwargs):
+            return self.resolve_gid(kwargs['id'], optimize=True)
+
+    class Query(graphene.ObjectType):
+        get_reporter = GetReporter.as_field()
+
+    schema = graphene.Schema(
+        query=Query,
+    )
+    gdtools.queryset.OPTIMIZATION_OPTIONS['Reporter'] = {
+        'only': {None: ['reporter_type']},
+    }
+    # `reporter2` loader does not cover `email`, so it is a different loader.
+    with django_assert_num_queries(2):
+        result = schema.execute(
+            '''\
+query getReporters($id1: ID, $id2: ID){
+    reporter2: getReporter(id: $id2) {
+        firstName
+    }
+    reporter1: getReporter(id: $id1) {
+        firstName
+        email
+    }
+}
+''',
+            context=http.HttpRequest(),
+            variables={
+                'id1': gdtools.GlobalID.from_object(reporter1),
+                'id2': gdtools.GlobalID.from_object(reporter2),
+            }
+        )
+        assert not result.errors
+        assert result.data == {
+            'reporter2': {
+                'firstName': 'reporter2'
+            },
+            'reporter1': {
+                'firstName': 'reporter1',
+                'email': 'reporter1@example.com',
+            },
+        }
+
+
+def _register_types():
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {'first_name': 'String!'},
+        }
+        model = models.Reporter
+
+    class Article(gdtools.Resolver):
+        schema = {
+            'type': {'headline': 'String!'},
+        }
+        model = models.Article
+
+
+def test_resolve_gids(django_assert_num_queries):
+    _register_types()
+    reporter1 = models.Reporter.objects.create(
+        first_name='reporter1',
+    )
+    reporter2 = models.Reporter.objects.create(
+        first_name='reporter2',
+    )
+    article = models.Article.objects.create(
+        headline='article1',
+        pub_date=timezone.now(),
+        pub_date_time=timezone.now(),
+        reporter=reporter1,
+        editor=reporter2,
+    )
+    resolver = gdtools.Resolver(
+        info=types.SimpleNamespace(context=http.HttpRequest()))
+    ids = [
+        str(gdtools.GlobalID.from_object(reporter2)),
+        str(gdtools.GlobalID.from_object(article)),
+        gdtools.GlobalID.from_object(reporter1),
+        reporter1,
+    ]
+    with django_assert_num_queries(2):
+        # Resolve inside promise callback, so loads are in same batch.
+        result = Promise.resolve(None).then(
+            lambda _: resolver.resolve_gids(ids)).get()
+    assert result == [reporter2, article, reporter1, reporter1]
+
+
+def test_resolve_gids_invalid():
+    _register_types()
+    resolver = gdtools.Resolver(
+        info=types.SimpleNamespace(context=http.HttpRequest()))
+    ids = [
+        str(gdtools.GlobalID(type='Reporter', value='1')),
+        'invalid',
+        str(gdtools.GlobalID(type='Article', value='1')),
+    ]
+    with pytest.raises(gdtools.global_id.InvalidGlobalIDError) as ex:
+        resolver.resolve_gids(ids, validate_type='Reporter')
+    assert str(ex.value) == (
+        'Invalid ids:\n'
+        '1: Invalid id: value=invalid\n'
+        '2: Unexpected id type: expected=Reporter, actual=Article.'
+    )
+
+
+def test_optimize_use_model_loader(django_assert_num_queries):
+    reporter = models.Reporter.objects.create(
+        first_name='reporter1',
+        email='reporter1@example.com',
+    )
+
+    class Reporter(gdtools.Resolver):
+        schema = {
+            'type': {'first_name': 'String!', 'email': 'String!'},
+        }
+        model = models.Reporter
+
+    class GetReporter(gdtools.Resolver):
+        schema = {
+            'args': {
+                'id': 'ID',
+                'optimize': 'Boolean',
+            },
+            'type': 'Reporter'
+        }
+
+        def resolve(self, **kwargs):
+            return self.resolve_gid(kwargs['id'], optimize=bool(kwargs.get('optimize')))
+
+    class Query(graphene.ObjectType):
+        get_reporter = GetReporter.as_field()
+
+    schema = graphene.Schema(query=Query)
+    # Object loaded by model loader is reused by optimized loader.
+    with django_assert_num_queries(1):
+        result = schema.execute(
+            '''\
+query getReporters($id: ID){
+    a: getReporter(id: $id) {
+        firstName
+    }
+    b: getReporter(id: $id, optimize: true) {
+        email
+    }
+}
+''',
+            context_value=http.HttpRequest(),
+            variable_values={'id': gdtools.GlobalID.from_object(reporter)},
+        )
+        assert not result.errors
+        assert result.data == {
+            'a': {'firstName': 'reporter1'},
+            'b': {'email': 'reporter1@example.com'},
+        }
@@ -0,0 +1,89 @@
+# pylint:disable=missing-docstring,invalid-name,unused-variable
+
+import pytest
+from django.core.cache import cache
+
+import graphene_django_tools as gdtools
+
+from . import models
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def _unregister():
+    yield
+    gdtools.shared_cache.REGISTRY.clear()
+    cache.clear()
+
+
+@pytest.mark.parametrize('backend', [
+    gdtools.shared_cache.MemoryBackend(),
+    gdtools.shared_cache.DjangoCacheBackend(),
+])
+def test_cross_loader(backend, django_assert_num_queries):
+    gdtools.shared_cache.register(models.Pet, backend)
+    pet1 = models.Pet.objects.create(name='pet1', age=1)
+    pet2 = models.Pet.objects.create(name='pet2', age=2)
+
+    loader = gdtools.dataloader.get_for_model(models.Pet)
+    with django_assert_num_queries(1):
+        assert loader.load(pet1.pk).get() == pet1
+    loader = gdtools.dataloader.get_for_model(models.Pet)
+    with django_assert_num_queries(0):
+        assert loader.load(pet1.pk).get().name == 'pet1'
+    with django_assert_num_queries(1):
+        assert loader.load(pet2.pk).get() == pet2
+
+    pet1.name = 'pet1 changed'
+    pet1.save()
+    loader = gdtools.dataloader.get_for_model(models.Pet)
+    with django_assert_num_queries(1):
+        assert loader.load(pet1.pk).get().name == 'pet1 changed'
+
+    pet2_pk = pet2.pk
+    pet2.delete()
+    loader = gdtools.dataloader.get_for_model(models.Pet)
+    with django_assert_num_queries(1):
+        assert loader.load(pet2_pk).get() is None
+
+
+def test_not_share_object():
+    gdtools.shared_cache.register(models.Pet)
+    pet = models.Pet.objects.create(name='pet1', age=1)
+
+    obj = gdtools.dataloader.get_for_model(models.Pet).load(pet.pk).get()
+    obj.name = 'modified'
+    obj = gdtools.dataloader.get_for_model(models.Pet).load(pet.pk).get()
+    assert obj.name == 'pet1'
+
+
+def test_memory_backend_ttl(monkeypatch):
+    now = [0]
+    monkeypatch.setattr(gdtools.shared_cache.time, 'monotonic', lambda: now[0])
+    backend = gdtools.shared_cache.MemoryBackend()
+    backend.set_many({'a': 1}, 10)
+    backend.set_many({'b': 2}, None)
+    assert backend.get_many(['a', 'b', 'c']) == {'a': 1, 'b': 2}
+    now[0] = 10
+    assert backend.get_many(['a', 'b']) == {'b': 2}
+    assert len(backend) == 1
+
+
+def test_memory_backend_lru():
+    backend = gdtools.shared_cache.MemoryBackend(maxsize=2)
+    backend.set_many({'a': 1, 'b': 2}, None)
+    assert backend.get_many(['a']) == {'a': 1}
+    backend.set_many({'c': 3}, None)
+    assert backend.get_many(['a', 'b', 'c']) == {'a': 1, 'c': 3}
+    backend.delete_many(['a'])
+    assert backend.get_many(['a', 'b', 'c']) == {'c': 3}
+
+
+def test_incomplete_backend():
+    class Backend(gdtools.shared_cache.Backend):
+        def get_many(self, keys):
+            return {}
+
+    with pytest.raises(TypeError):
+        Backend()